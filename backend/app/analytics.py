@@ -0,0 +1,131 @@
+"""Per-group placement breakdowns for /api/stats/grouped.
+
+Average and median CTC are both taken over explicit CTC amounts, and the
+stipend ones over explicit stipends (the average weighted by students
+selected, as in app.stats). median_fixed is the median of Fixed values, which
+is what the dashboard's /api/stats calls median_ctc.
+"""
+import threading
+from typing import Literal
+
+from sqlalchemy import case, distinct, func, join, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import Branch, Company, company_branches
+
+
+GroupBy = Literal["month", "season", "offer_type", "offer_category", "branch", "company"]
+
+
+def _group_key(by: GroupBy, dialect: str):
+    if by == "month":
+        if dialect == "postgresql":
+            return func.to_char(Company.notification_date, "YYYY-MM")
+        return func.strftime("%Y-%m", Company.notification_date)
+    if by == "season":
+        return Company.season
+    if by == "offer_type":
+        return Company.type_of_offer
+    if by == "offer_category":
+        return Company.offer_category
+    if by == "company":
+        return Company.company_name
+    if by == "branch":
+        return Branch.code
+    raise ValueError(f"Unknown grouping {by}")
+
+
+def _source(by: GroupBy):
+    if by == "branch":
+        # A company open to several branches counts towards each of them
+        return join(Company, company_branches, company_branches.c.company_id == Company.id).join(
+            Branch, Branch.id == company_branches.c.branch_id
+        )
+    return Company.__table__
+
+
+def _medians(db: Session, source, key, value) -> dict:
+    """Per-group median of `value`, using window functions to pick the middle rows"""
+    ranked = (
+        select(
+            key.label("key"),
+            value.label("value"),
+            func.row_number().over(partition_by=key, order_by=value).label("rn"),
+            func.count().over(partition_by=key).label("cnt"),
+        )
+        .select_from(source)
+        .where(value.is_not(None))
+        .subquery()
+    )
+    middle = or_(ranked.c.rn == (ranked.c.cnt + 1) // 2, ranked.c.rn == (ranked.c.cnt + 2) // 2)
+    stmt = select(ranked.c.key, func.avg(ranked.c.value)).where(middle).group_by(ranked.c.key)
+    return dict(db.execute(stmt).all())
+
+
+def grouped_stats(db: Session, by: GroupBy) -> list[dict]:
+    source = _source(by)
+    expr = _group_key(by, db.get_bind().dialect.name)
+    key = expr.label("key")
+    stipend_weight = case((Company.stipend_amount.is_not(None), Company.students_selected))
+    stmt = (
+        select(
+            key,
+            func.count(),
+            func.count(distinct(Company.company_name)),
+            func.sum(Company.students_selected),
+            func.avg(Company.ctc_amount),
+            func.sum(Company.stipend_amount * Company.students_selected) / func.nullif(func.sum(stipend_weight), 0),
+        )
+        .select_from(source)
+        .group_by(key)
+        .order_by(key)
+    )
+    median_ctc = _medians(db, source, expr, Company.ctc_amount)
+    median_fixed = _medians(db, source, expr, Company.fixed_amount)
+    median_stipend = _medians(db, source, expr, Company.stipend_amount)
+    return [
+        {
+            "key": group,
+            "entries": entries,
+            "companies": companies,
+            "students_selected": students or 0,
+            "average_ctc": average_ctc or 0.0,
+            "median_ctc": median_ctc.get(group, 0.0),
+            "median_fixed": median_fixed.get(group, 0.0),
+            "average_stipend": average_stipend or 0.0,
+            "median_stipend": median_stipend.get(group, 0.0),
+        }
+        for group, entries, companies, students, average_ctc, average_stipend in db.execute(stmt).all()
+    ]
+
+
+class GroupedStatsCache:
+    """Grouped results per `by`, tagged with the data version they were read at.
+
+    A lookup with a newer version misses, so any committed write (which bumps
+    the version) invalidates every grouping without an explicit hook.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[int, list[dict]]] = {}
+
+    def get(self, by: str, version: int) -> list[dict] | None:
+        with self._lock:
+            entry = self._entries.get(by)
+        if entry and entry[0] == version:
+            return entry[1]
+        return None
+
+    def put(self, by: str, version: int, groups: list[dict]):
+        with self._lock:
+            current = self._entries.get(by)
+            if current is None or current[0] <= version:
+                self._entries[by] = (version, groups)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+grouped_cache = GroupedStatsCache()
@@ -0,0 +1,131 @@
+"""Async versions of the company and stats read endpoints.
+
+Included ahead of the sync handlers in app.main when ASYNC_DB is enabled, so
+reads await the database instead of holding a threadpool worker. Writes stay
+on the sync handlers.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.async_database import get_async_db
+from app.models import Company
+from app.queries import CompanyListParams, InvalidCursor, finish_page, plan_company_list
+from app.schemas import Company as CompanySchema
+from app.config import settings
+from app.parsing import SEASON_PATTERN
+from app.stats import StatsRow, compute_stats, consistency_report, stats_select, stats_store
+from app.serialization import (
+    InvalidFields,
+    columnar_response,
+    field_columns,
+    json_response,
+    object_response,
+    select_fields,
+)
+from app.versioning import conditional_get
+
+router = APIRouter()
+
+# Cold-store loads to try before answering from a one-off recompute
+STATS_LOAD_ATTEMPTS = 3
+
+
+@router.get("/api/companies", response_model=List[CompanySchema])
+async def get_companies(
+    request: Request,
+    response: Response,
+    params: CompanyListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    try:
+        fields = select_fields(params.fields)
+        plan = plan_company_list(params, field_columns(fields))
+    except (InvalidCursor, InvalidFields) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if plan.count_stmt is not None:
+        response.headers["X-Total-Count"] = str(await db.scalar(plan.count_stmt))
+    rows, next_cursor = finish_page((await db.execute(plan.stmt)).all(), plan)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if params.format == "columnar":
+        return columnar_response(rows, response, fields)
+    # Plain rows encoded straight to JSON; same bytes as the response_model path
+    return json_response(rows, response, fields)
+
+
+# :int keeps /api/companies/export and friends routed to their own handlers
+@router.get("/api/companies/{company_id:int}", response_model=CompanySchema)
+async def get_company(
+    company_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    try:
+        names = select_fields(fields)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    row = (await db.execute(select(*field_columns(names)).where(Company.id == company_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return object_response(row, response, names)
+
+
+@router.get("/api/stats")
+async def get_stats(
+    request: Request,
+    response: Response,
+    season: Optional[str] = Query(
+        None, pattern=SEASON_PATTERN, description="Placement season, e.g. 2025-26; all seasons when omitted"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    if settings.STATS_CONSISTENCY_CHECK:
+        return await _checked_stats(db, season)
+    rows: list[StatsRow] = []
+    for _ in range(STATS_LOAD_ATTEMPTS):
+        # Never wait on the store lock here: writes hold it across their commit
+        # and sync loads across a full read, which would stall the event loop
+        stats = stats_store.cached(season, blocking=False)
+        if stats is not None:
+            return stats
+        # Cold or busy store: query without the lock; load_from refuses rows
+        # that a concurrent write may have outdated
+        generation = stats_store.generation
+        rows = [StatsRow(*row) for row in (await db.execute(stats_select(season))).all()]
+        if stats_store.load_from(rows, generation, season, blocking=False):
+            # A season without rows is not kept, so fall back to the rows just read
+            return stats_store.cached(season, blocking=False) or compute_stats(rows)
+    # Writes kept outdating the load; the last read is still one consistent snapshot
+    return stats_store.cached(season, blocking=False) or compute_stats(rows)
+
+
+async def _checked_stats(db: AsyncSession, season: str | None) -> dict:
+    """STATS_CONSISTENCY_CHECK: serve a full recompute and rebuild the store if it drifted"""
+    generation = stats_store.generation
+    incremental = stats_store.cached(season, blocking=False)
+    rows = [StatsRow(*row) for row in (await db.execute(stats_select(season))).all()]
+    recomputed = compute_stats(rows)
+    if incremental is None:
+        stats_store.load_from(rows, generation, season, blocking=False)
+    elif generation == stats_store.generation:
+        # Compared only when no write landed between the two reads
+        report = consistency_report(incremental, recomputed)
+        if not report["consistent"]:
+            print(f"Warning: incremental stats drifted on {report['mismatches']}; rebuilding")
+            await run_in_threadpool(stats_store.invalidate)
+    return recomputed
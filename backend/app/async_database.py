@@ -0,0 +1,46 @@
+"""Async engine for the opt-in async request path (ASYNC_DB=true).
+
+Uses aiosqlite for SQLite and asyncpg for PostgreSQL; install whichever
+driver matches DATABASE_URL.
+"""
+from sqlalchemy import event, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import DATABASE_URL, IS_SQLITE, POOL_ARGS, read_only_url, sqlite_pragmas
+
+
+def async_url(url: str):
+    """Swap the sync driver in DATABASE_URL for its async counterpart"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite")
+    if backend in ("postgresql", "postgres"):
+        return parsed.set(drivername="postgresql+asyncpg")
+    raise ValueError(f"No async driver configured for {backend}")
+
+
+if IS_SQLITE:
+    # Every async handler only reads, so the read-only URL is safe when enabled
+    url = read_only_url(DATABASE_URL) if settings.DB_READ_ENGINE else make_url(DATABASE_URL)
+    async_engine = create_async_engine(async_url(url.render_as_string(hide_password=False)), **POOL_ARGS)
+    pragmas = sqlite_pragmas(read_only=settings.DB_READ_ENGINE)
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def apply_profile(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+else:
+    async_engine = create_async_engine(async_url(DATABASE_URL), **POOL_ARGS)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,58 @@
+"""Sync of the normalized company_branches links with branches_allowed.
+
+Every write that sets branches_allowed calls sync_branches in the same
+transaction; deletes call unlink_branches first, since SQLite does not
+enforce the ON DELETE CASCADE unless foreign keys are switched on.
+"""
+from typing import Iterable
+
+from sqlalchemy import delete, insert, select
+
+from app.models import Branch, Company, company_branches
+from app.parsing import BRANCH_NAMES, canonical_branches
+
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+
+def branch_ids(db, codes: Iterable[str]) -> dict[str, int]:
+    """Ids for branch codes, creating any branch seen for the first time"""
+    codes = set(codes)
+    if not codes:
+        return {}
+    stmt = select(Branch.code, Branch.id).where(Branch.code.in_(codes))
+    ids = dict(db.execute(stmt).all())
+    missing = codes - ids.keys()
+    if missing:
+        db.execute(insert(Branch), [{"code": code, "name": BRANCH_NAMES.get(code, code)} for code in sorted(missing)])
+        ids = dict(db.execute(stmt).all())
+    return ids
+
+
+def unlink_branches(db, company_ids: list[int]):
+    for start in range(0, len(company_ids), CHUNK_SIZE):
+        chunk = company_ids[start:start + CHUNK_SIZE]
+        db.execute(delete(company_branches).where(company_branches.c.company_id.in_(chunk)))
+
+
+def sync_branches(db, rows: Iterable[tuple[int, str | None]]):
+    """Replace the branch links of each (company id, branches_allowed) row"""
+    codes = {company_id: canonical_branches(text) for company_id, text in rows}
+    if not codes:
+        return
+    unlink_branches(db, list(codes))
+    ids = branch_ids(db, {code for row_codes in codes.values() for code in row_codes})
+    links = [
+        {"company_id": company_id, "branch_id": ids[code]}
+        for company_id, row_codes in codes.items()
+        for code in row_codes
+    ]
+    db.execute(insert(company_branches), links)
+
+
+def backfill_branches(conn):
+    """Link every company from its branches_allowed text"""
+    rows = conn.execute(select(Company.id, Company.branches_allowed)).all()
+    for start in range(0, len(rows), CHUNK_SIZE):
+        sync_branches(conn, rows[start:start + CHUNK_SIZE])
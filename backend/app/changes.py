@@ -0,0 +1,160 @@
+"""Change log for delta sync (GET /api/companies/changes?since=<seq>).
+
+Every write records (seq, company_id, op) in the same transaction as the
+change itself, so a committed sequence number always describes committed
+data. Compaction keeps only the newest entry per company and purges old
+delete tombstones; the highest purged sequence becomes the horizon, and
+clients asking from before it are told to reset and resync.
+
+The same transaction bumps the shared data version in app_meta, which every
+worker compares with its own caches (see app.coherence).
+"""
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.models import AppMeta, Company, CompanyChange
+from app.serialization import COMPANY_COLUMNS, rows_to_dicts
+
+
+HORIZON_KEY = "change_log_horizon"
+VERSION_KEY = "data_version"
+# Random per database, so a recreated database never reissues an old ETag
+EPOCH_KEY = "data_epoch"
+# SEASON_PREFIX + season: the data version that last wrote to that season, so
+# other workers can drop only those seasons' stats; ALL_SEASONS for any season
+SEASON_PREFIX = "season_version:"
+ALL_SEASONS = "*"
+CHUNK_SIZE = 500
+
+
+def record_changes(db, op: str, company_ids: Iterable[int], seasons: Iterable[str] | None = None):
+    """Append one log entry per company; call before the write transaction commits.
+
+    seasons: every season the write adds rows to or removes them from (old
+    and new on a move); None when unknown, which marks all of them.
+    """
+    entries = [{"company_id": company_id, "op": op} for company_id in company_ids]
+    if entries:
+        db.execute(insert(CompanyChange), entries)
+        bump_version(db, seasons)
+
+
+def bump_version(db, seasons: Iterable[str] | None = None) -> int:
+    """Increment the shared data version in the caller's transaction.
+
+    The new value is left in db.info for the after-commit hook in app.coherence.
+    """
+    version = db.execute(
+        update(AppMeta).where(AppMeta.key == VERSION_KEY).values(value=AppMeta.value + 1).returning(AppMeta.value)
+    ).scalar()
+    if version is None:
+        version = 1
+        db.execute(insert(AppMeta).values(key=VERSION_KEY, value=version))
+    for season in set(seasons) if seasons is not None else {ALL_SEASONS}:
+        key = SEASON_PREFIX + season
+        if not db.execute(update(AppMeta).where(AppMeta.key == key).values(value=version)).rowcount:
+            db.execute(insert(AppMeta).values(key=key, value=version))
+    db.info["data_version"] = version
+    return version
+
+
+def init_version(conn):
+    """Create the shared version and epoch rows once"""
+    existing = set(conn.scalars(select(AppMeta.key).where(AppMeta.key.in_((VERSION_KEY, EPOCH_KEY)))))
+    if VERSION_KEY not in existing:
+        conn.execute(insert(AppMeta).values(key=VERSION_KEY, value=0))
+    if EPOCH_KEY not in existing:
+        conn.execute(insert(AppMeta).values(key=EPOCH_KEY, value=secrets.randbelow(2**31)))
+
+
+def changed_ids(db, since: int, limit: int) -> tuple[list[int] | None, int]:
+    """Companies with log entries after `since` (None when more than limit) and the newest seq"""
+    newest = max(db.scalar(select(func.max(CompanyChange.seq))) or 0, since)
+    ids = db.scalars(
+        select(CompanyChange.company_id)
+        .where(CompanyChange.seq > since, CompanyChange.seq <= newest)
+        .distinct()
+        .limit(limit + 1)
+    ).all()
+    return (list(ids) if len(ids) <= limit else None), newest
+
+
+def horizon(db) -> int:
+    return db.scalar(select(AppMeta.value).where(AppMeta.key == HORIZON_KEY)) or 0
+
+
+def _superseded():
+    """EXISTS a newer entry for the same company (an index probe on company_id, seq)"""
+    newer = aliased(CompanyChange)
+    return (
+        select(newer.seq)
+        .where(newer.company_id == CompanyChange.company_id, newer.seq > CompanyChange.seq)
+        .exists()
+    )
+
+
+def changes_since(db: Session, since: int, limit: int) -> dict:
+    """Net changes after `since`: at most one entry per company, oldest first"""
+    reset = since < horizon(db)
+    if reset:
+        # Tombstones the client needs were purged; send the live set from scratch
+        since = 0
+    # Range scan on seq, keeping each company's newest entry
+    entries = db.execute(
+        select(CompanyChange.seq, CompanyChange.company_id, CompanyChange.op)
+        .where(CompanyChange.seq > since, ~_superseded())
+        .order_by(CompanyChange.seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    live_ids = [e.company_id for e in entries if e.op != "delete"]
+    companies = {}
+    for start in range(0, len(live_ids), CHUNK_SIZE):
+        chunk = live_ids[start:start + CHUNK_SIZE]
+        rows = db.execute(select(*COMPANY_COLUMNS).where(Company.id.in_(chunk))).all()
+        companies.update((row["id"], row) for row in rows_to_dicts(rows))
+
+    changes = []
+    for entry in entries:
+        company = companies.get(entry.company_id)
+        if company is None:
+            # Deleted, or deleted after this entry was written (its tombstone follows)
+            changes.append({"seq": entry.seq, "op": "delete", "id": entry.company_id})
+        else:
+            changes.append({"seq": entry.seq, "op": "upsert", "id": entry.company_id, "company": company})
+    # Entries are each company's newest, so the last one is the newest change seen
+    next_seq = entries[-1].seq if entries else since
+    return {"since": since, "next": next_seq, "reset": reset, "has_more": has_more, "changes": changes}
+
+
+def compact_changes(db: Session, tombstone_days: int) -> dict:
+    """Drop superseded entries and tombstones older than `tombstone_days`; commits"""
+    superseded = db.execute(delete(CompanyChange).where(_superseded())).rowcount
+
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=tombstone_days)
+    expired = (CompanyChange.op == "delete", CompanyChange.changed_at < cutoff)
+    purged_upto = db.scalar(select(func.max(CompanyChange.seq)).where(*expired))
+    purged = 0
+    if purged_upto is not None:
+        purged = db.execute(delete(CompanyChange).where(*expired)).rowcount
+        meta = db.get(AppMeta, HORIZON_KEY)
+        if meta is None:
+            db.add(AppMeta(key=HORIZON_KEY, value=purged_upto))
+        else:
+            meta.value = max(meta.value, purged_upto)
+    db.commit()
+    return {"superseded_removed": superseded, "tombstones_purged": purged, "horizon": horizon(db)}
+
+
+def backfill_changes(conn):
+    """Log existing companies as inserts so a sync from 0 returns the full set"""
+    if conn.execute(select(CompanyChange.seq).limit(1)).first():
+        return
+    ids = conn.scalars(select(Company.id).order_by(Company.id)).all()
+    record_changes(conn, "insert", ids)
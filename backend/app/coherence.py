@@ -0,0 +1,184 @@
+"""Cache coherence across uvicorn/gunicorn workers (SHARED_VERSION_CHECK).
+
+Each worker keeps its own caches (materialized stats, grouped stats, response
+bodies), and a write served by one worker cannot reach another's memory.
+Every write therefore bumps the shared data version row in app_meta inside
+its own transaction (changes.record_changes). At the start of each request
+the worker compares that row with the version its caches reflect and drops
+them when another process (a worker or the command-line importer) wrote.
+Stats are dropped only for the seasons those writes touched: each write also
+stamps its version on a row per season (changes.SEASON_PREFIX), and the
+seasons whose stamp moved since the last sync are the stale ones.
+
+On SQLite the check is PRAGMA data_version on a dedicated connection: it
+changes only when another connection commits and costs no I/O otherwise, so
+the version row is read only after a commit. That "nothing changed" answer
+is tried on the event loop without ever waiting: the lock is only tried and
+the connection's busy timeout is zero. Anything else (first connect, a
+commit to read, a busy database, a concurrent check) goes to the threadpool,
+as does every check on other databases, which read the row (one primary-key
+lookup) per request.
+"""
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from starlette.concurrency import run_in_threadpool
+
+from app.changes import ALL_SEASONS, EPOCH_KEY, SEASON_PREFIX, VERSION_KEY
+from app.config import settings
+from app.stats import stats_store
+from app.versioning import data_version
+
+
+VERSION_SQL = (
+    f"SELECT key, value FROM app_meta WHERE key IN ('{VERSION_KEY}', '{EPOCH_KEY}') "
+    f"OR key LIKE '{SEASON_PREFIX}%'"
+)
+
+
+class VersionMonitor:
+    """Reads (version, epoch) and the season stamps from app_meta over its own DBAPI connection.
+
+    Raw cursors keep these checks out of the query metrics and slow-query log.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.sqlite = url.get_backend_name() == "sqlite"
+        self._lock = threading.Lock()
+        self._conn = None
+        self._marker = None
+        self._current: tuple[int, int] | None = None
+        self._seasons: dict[str, int] = {}
+        # (epoch, season stamps) the stats store reflects; serialized by _sync_lock
+        self._sync_lock = threading.Lock()
+        self._seen: tuple[int, dict[str, int]] | None = None
+
+    def _connect(self):
+        # Used from the event loop and threadpool threads; the lock serializes it.
+        # timeout=0: a locked database fails poll() at once instead of stalling the loop
+        connect_args = {"check_same_thread": False, "timeout": 0} if self.sqlite else {}
+        return create_engine(self.url, poolclass=NullPool, connect_args=connect_args).raw_connection()
+
+    def poll(self) -> bool | None:
+        """sync() for the event loop: never waits, answers only "no commit since the last sync".
+
+        None means the caller should sync() in the threadpool.
+        """
+        if not self.sqlite or not self._lock.acquire(blocking=False):
+            return None
+        try:
+            if self._conn is None or self._current is None:
+                return None
+            cursor = self._conn.cursor()
+            try:
+                cursor.execute("PRAGMA data_version")
+                if cursor.fetchone()[0] != self._marker:
+                    return None
+            finally:
+                cursor.close()
+            current = self._current
+        except Exception:
+            return None
+        finally:
+            self._lock.release()
+        return False if data_version.adopted(*current) else None
+
+    def current(self) -> tuple[int, int] | None:
+        """(version, epoch), or None when the database cannot be read"""
+        read = self._read()
+        return read and read[:2]
+
+    def _read(self) -> tuple[int, int, dict[str, int]] | None:
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = self._connect()
+                cursor = self._conn.cursor()
+                try:
+                    if self.sqlite:
+                        # Off the event loop: wait for a writer like any other reader
+                        cursor.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+                        cursor.execute("PRAGMA data_version")
+                        marker = cursor.fetchone()[0]
+                        if marker == self._marker and self._current is not None:
+                            return (*self._current, self._seasons)
+                        # Read before the row: a commit landing in between changes it again
+                        self._marker = marker
+                    cursor.execute(VERSION_SQL)
+                    values = dict(cursor.fetchall())
+                finally:
+                    if self.sqlite:
+                        cursor.execute("PRAGMA busy_timeout = 0")
+                    cursor.close()
+                # Don't sit idle in a transaction that could hide later commits
+                self._conn.rollback()
+            except Exception as e:
+                print(f"Warning: could not read shared data version: {e}")
+                self.close()
+                return None
+            self._current = (values.pop(VERSION_KEY, 0), values.pop(EPOCH_KEY, 0))
+            self._seasons = {key.removeprefix(SEASON_PREFIX): value for key, value in values.items()}
+            return (*self._current, self._seasons)
+
+    def sync(self) -> bool:
+        """Adopt the shared version; True when another process changed the data"""
+        with self._sync_lock:
+            read = self._read()
+            if read is None:
+                return False
+            version, epoch, seasons = read
+            # Before observe(): its listeners (the SSE relay) read the stats
+            if not data_version.adopted(version, epoch):
+                stats_store.invalidate(self._stale_seasons(epoch, seasons))
+            self._seen = (epoch, seasons)
+            return data_version.observe(version, epoch)
+
+    def _stale_seasons(self, epoch: int, seasons: dict[str, int]) -> set[str] | None:
+        """Seasons written since the last sync; None when that is unknown"""
+        if self._seen is None or self._seen[0] != epoch:
+            return None
+        seen = self._seen[1]
+        stale = {season for season in seasons.keys() | seen.keys() if seasons.get(season) != seen.get(season)}
+        return None if ALL_SEASONS in stale else stale
+
+    def close(self):
+        # Callers hold the lock
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn, self._marker, self._current = None, None, None
+
+
+def _after_commit(session):
+    version = session.info.pop("data_version", None)
+    if version is not None:
+        data_version.committed(version)
+
+
+def _after_rollback(session):
+    session.info.pop("data_version", None)
+
+
+def install_commit_hooks():
+    """Let each session's committed version through without invalidating this process's caches"""
+    if not event.contains(Session, "after_commit", _after_commit):
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+
+class CoherenceMiddleware:
+    """Syncs with the shared data version before every request"""
+
+    def __init__(self, app, monitor: VersionMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.monitor.poll() is None:
+            await run_in_threadpool(self.monitor.sync)
+        await self.app(scope, receive, send)
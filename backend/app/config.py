@@ -10,6 +10,67 @@ class Settings(BaseSettings):
 
     ADMIN_TOKEN: str = "change-me"
 
+    # Recompute /api/stats from scratch on every call and compare it with the
+    # incrementally maintained result (debugging aid; logs mismatches)
+    STATS_CONSISTENCY_CHECK: bool = False
+
+    # SQLite tuning applied to every new connection: "performance" enables WAL,
+    # synchronous=NORMAL, memory-mapped I/O and a larger page cache; "default"
+    # leaves SQLite's own settings alone
+    SQLITE_PROFILE: str = "performance"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Connection pool sizing (SQLite file databases and external databases)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    # Serve GET endpoints from a separate read-only SQLite engine so reads never
+    # queue behind the writer's connection pool
+    DB_READ_ENGINE: bool = False
+
+    # Serve the company and stats reads from async handlers on an async engine
+    # (aiosqlite locally, asyncpg for PostgreSQL); writes stay synchronous
+    ASYNC_DB: bool = False
+
+    # Request latency, SQL timing and pool metrics at /api/metrics (Prometheus
+    # text format); cheap enough to leave on in production
+    METRICS_ENABLED: bool = True
+
+    # Diagnostic mode: capture statements slower than SLOW_QUERY_MS with their
+    # parameters, route and query plan, and flag requests that repeat a statement
+    # N_PLUS_ONE_THRESHOLD or more times (admin /api/debug/slow-queries)
+    QUERY_DIAGNOSTICS: bool = False
+    SLOW_QUERY_MS: float = 100.0
+    SLOW_QUERY_LOG_SIZE: int = 200
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    # In-process cache of encoded (and gzip/brotli) response bodies for the public
+    # GET endpoints, keyed by URL and data version; 0 disables it
+    RESPONSE_CACHE_BYTES: int = 32 * 1024 * 1024
+
+    # Check the shared data version (app_meta) before every request and drop
+    # this process's caches when another worker or process wrote; required
+    # with more than one worker (WEB_CONCURRENCY), a pragma read on SQLite
+    SHARED_VERSION_CHECK: bool = True
+
+    # Migrate, seed and compact the change log when the app starts. Turn off
+    # for multi-worker servers and run `python -m app.seed` once before them
+    # instead (the Docker image does)
+    INIT_DB_ON_STARTUP: bool = True
+
+    # Static snapshot bundle (app.snapshot) for a CDN or GitHub Pages: when set,
+    # rewritten in the background SNAPSHOT_DELAY_SECONDS after writes, keeping
+    # the newest SNAPSHOT_KEEP versions
+    SNAPSHOT_DIR: str = ""
+    SNAPSHOT_KEEP: int = 3
+    SNAPSHOT_DELAY_SECONDS: float = 2.0
+
+    # Change log (/api/companies/changes): delete tombstones older than this are
+    # purged on compaction; clients that last synced before then get a reset
+    CHANGE_LOG_TOMBSTONE_DAYS: int = 30
+
     # Ensure values are loaded from backend/.env as well as process env
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
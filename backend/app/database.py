@@ -1,6 +1,15 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, make_url, select, text
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker
-from app.models import Base
+from app.config import settings
+from app.metrics import install_query_metrics, timed_pool
+from app.querylog import install_query_diagnostics
+from app.models import Base, Company, company_branches
+from app.branches import backfill_branches
+from app.changes import backfill_changes, init_version
+from app.parsing import compensation_columns, offer_columns, season_for
+from app.search import install_search
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -50,14 +59,88 @@ else:
     # Using external database (PostgreSQL, etc.)
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./placement_tracker.db")
 
+IS_SQLITE = "sqlite" in DATABASE_URL
+POOL_ARGS = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+
+if settings.METRICS_ENABLED:
+    install_query_metrics()
+if settings.QUERY_DIAGNOSTICS:
+    install_query_diagnostics()
+
+def pool_class(name: str):
+    """QueuePool, timed per checkout when metrics are enabled"""
+    return timed_pool(name) if settings.METRICS_ENABLED else QueuePool
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    """PRAGMAs for the configured SQLite performance profile"""
+    if settings.SQLITE_PROFILE != "performance":
+        return [f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}"]
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA synchronous = NORMAL",
+        f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # WAL lets readers proceed while a write is in progress; it persists in the file
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    return pragmas
+
+def create_sqlite_engine(url, read_only: bool = False):
+    sqlite_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=pool_class("read" if read_only else "primary"),
+        **POOL_ARGS,
+    )
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(sqlite_engine, "connect")
+    def apply_profile(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return sqlite_engine
+
+def read_only_url(url: str):
+    """The same SQLite file opened with mode=ro"""
+    parsed = make_url(url)
+    return parsed.set(database=f"file:{parsed.database}", query={"mode": "ro", "uri": "true"})
+
 # Create engine with appropriate connection args
-if "sqlite" in DATABASE_URL:
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+if IS_SQLITE:
+    engine = create_sqlite_engine(DATABASE_URL)
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, poolclass=pool_class("primary"), **POOL_ARGS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read-only engine for GET endpoints (SQLite only; WAL keeps it current)
+if settings.DB_READ_ENGINE and IS_SQLITE:
+    read_engine = create_sqlite_engine(read_only_url(DATABASE_URL), read_only=True)
+else:
+    read_engine = engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Indexes earlier versions created that no query uses any more
+OBSOLETE_INDEXES = (
+    # q matches anywhere in the name (LIKE '%q%'), which a B-tree index cannot serve;
+    # name search goes through the full-text index (/api/search)
+    "ix_companies_company_name",
+    # Superseded by ix_company_changes_company_seq, which also serves the
+    # "newer entry for this company?" probe in changes_since/compact_changes
+    "ix_company_changes_company_id",
+)
+
 def init_db():
     # Ensure database directory exists (important for cloud deployments)
     if DB_FILE and DB_FILE.parent:
@@ -72,9 +155,92 @@ def init_db():
             if "process" not in names:
                 conn.execute(text("ALTER TABLE companies ADD COLUMN process TEXT NOT NULL DEFAULT 'Completed'"))
                 conn.commit()
+            # Parsed compensation columns: add and backfill from ctc_stipend once
+            amount_cols = ["ctc_amount", "stipend_amount", "fixed_amount"]
+            if any(col not in names for col in amount_cols):
+                for col in amount_cols:
+                    if col not in names:
+                        conn.execute(text(f"ALTER TABLE companies ADD COLUMN {col} FLOAT"))
+                backfill_compensation(conn)
+                conn.commit()
+            # Offer classification: add and backfill from type_of_offer once
+            if "offer_category" not in names or "is_ppo" not in names:
+                if "offer_category" not in names:
+                    conn.execute(text("ALTER TABLE companies ADD COLUMN offer_category VARCHAR(16) NOT NULL DEFAULT 'other'"))
+                if "is_ppo" not in names:
+                    conn.execute(text("ALTER TABLE companies ADD COLUMN is_ppo BOOLEAN NOT NULL DEFAULT 0"))
+                backfill_offers(conn)
+                conn.commit()
+            # Placement season: add and derive from notification_date once
+            if "season" not in names:
+                conn.execute(text("ALTER TABLE companies ADD COLUMN season VARCHAR(7) NOT NULL DEFAULT ''"))
+                backfill_seasons(conn)
+                conn.commit()
     except Exception:
         # Do not crash app if pragma/alter fails; table may not exist yet
         pass
+    # create_all only indexes new tables; add indexes introduced since then
+    # and drop the ones the models no longer declare
+    try:
+        with engine.begin() as conn:
+            for table in ("companies", "company_changes"):
+                for index in Base.metadata.tables[table].indexes:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+            for name in OBSOLETE_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    except Exception as e:
+        print(f"Warning: could not create indexes: {e}")
+    # Branch links: build them once for companies that predate the table
+    try:
+        with engine.begin() as conn:
+            if not conn.execute(select(company_branches.c.company_id).limit(1)).first():
+                backfill_branches(conn)
+    except Exception as e:
+        print(f"Warning: could not backfill branches: {e}")
+    # Shared data version that keeps every worker's caches coherent
+    try:
+        with engine.begin() as conn:
+            init_version(conn)
+    except Exception as e:
+        print(f"Warning: could not create data version: {e}")
+    # Change log: seed it with the companies that predate it
+    try:
+        with engine.begin() as conn:
+            backfill_changes(conn)
+    except Exception as e:
+        print(f"Warning: could not backfill change log: {e}")
+    # Full-text index for /api/search, kept in sync by triggers
+    install_search(engine)
+
+def backfill_compensation(conn):
+    """Re-parse ctc_stipend for every row and store the amounts"""
+    rows = conn.execute(text("SELECT id, ctc_stipend FROM companies")).fetchall()
+    params = [{"id": row[0], **compensation_columns(row[1])} for row in rows]
+    if params:
+        conn.execute(
+            text(
+                "UPDATE companies SET ctc_amount = :ctc_amount, stipend_amount = :stipend_amount, "
+                "fixed_amount = :fixed_amount WHERE id = :id"
+            ),
+            params,
+        )
+
+def backfill_offers(conn):
+    """Classify type_of_offer for every row and store the result"""
+    rows = conn.execute(text("SELECT id, type_of_offer FROM companies")).fetchall()
+    params = [{"id": row[0], **offer_columns(row[1])} for row in rows]
+    if params:
+        conn.execute(
+            text("UPDATE companies SET offer_category = :offer_category, is_ppo = :is_ppo WHERE id = :id"),
+            params,
+        )
+
+def backfill_seasons(conn):
+    """Derive the season of every row from its notification_date"""
+    rows = conn.execute(select(Company.id, Company.notification_date)).all()
+    params = [{"id": row[0], "season": season_for(row[1])} for row in rows]
+    if params:
+        conn.execute(text("UPDATE companies SET season = :season WHERE id = :id"), params)
 
 def get_db():
     db = SessionLocal()
@@ -83,3 +249,9 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,178 @@
+"""In-process pub/sub feeding the /api/events Server-Sent Events stream.
+
+Write handlers publish one event per change; it is encoded to an SSE frame
+once and queued for every connected client. Handlers run in the threadpool,
+so frames are handed to each event loop with call_soon_threadsafe.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.changes import changed_ids
+from app.schemas import Company as CompanySchema
+from app.serialization import dumps
+from app.stats import stats_store
+
+
+# Frames buffered per client; a client that falls further behind is disconnected
+# and its EventSource reconnects (and refetches) on its own
+MAX_PENDING = 256
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 3000
+# How often a worker with subscribers looks for writes made by other workers
+RELAY_SECONDS = 1.0
+# Changed ids listed in one relayed event; beyond that clients just refetch
+RELAY_MAX_IDS = 500
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING)
+
+    def deliver(self, frame: bytes | None):
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Too slow: drop the backlog and tell the stream to close
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+def _deliver_all(subscribers: list[Subscriber], frame: bytes):
+    for subscriber in subscribers:
+        subscriber.deliver(frame)
+
+
+class Broadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: set[Subscriber] = set()
+        self._seq = 0
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: str, data: dict):
+        """Encode once and queue for every subscriber; safe to call from any thread"""
+        with self._lock:
+            if not self._subscribers:
+                return
+            self._seq += 1
+            frame = b"id: %d\nevent: %s\ndata: %s\n\n" % (self._seq, event.encode(), dumps(data))
+            by_loop = defaultdict(list)
+            for subscriber in self._subscribers:
+                by_loop[subscriber.loop].append(subscriber)
+        # One wake-up per event loop, not per subscriber
+        for loop, subscribers in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, subscribers, frame)
+            except RuntimeError:
+                # Loop already closed; its streams are gone
+                for subscriber in subscribers:
+                    self.unsubscribe(subscriber)
+
+    async def stream(self, subscriber: Subscriber):
+        """SSE frames for one client, with comment heartbeats to keep proxies from timing out"""
+        try:
+            yield b"retry: %d\n\n" % RETRY_MS
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    frame = b": keep-alive\n\n"
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+
+broadcaster = Broadcaster()
+
+
+def publish_change(db: Session, event: str, op: str, company=None, **payload):
+    """Broadcast a committed write together with the stats as of that write.
+
+    event "company" carries the full row (or just its id on delete); event
+    "companies" describes a bulk write by ids or count.
+    """
+    if not broadcaster.subscriber_count:
+        return
+    data = {"op": op, **payload}
+    if company is not None:
+        data["company"] = CompanySchema.model_validate(company).model_dump(mode="json")
+    data["stats"] = stats_store.snapshot(db)
+    broadcaster.publish(event, data)
+
+
+class ChangeRelay:
+    """Forwards writes made by other processes to this worker's subscribers.
+
+    The broadcaster only sees writes served by its own worker. While anyone is
+    subscribed, the relay syncs with the shared data version every
+    RELAY_SECONDS (requests sync as well), and whenever another process's write
+    is observed it publishes one "companies" event with op "sync", the changed
+    ids (from the change log) and the fresh stats.
+    """
+
+    def __init__(self, sync: Callable[[], bool], session_factory, interval: float = RELAY_SECONDS):
+        self.sync = sync
+        self.session_factory = session_factory
+        self.interval = interval
+        self._pending = threading.Event()
+        self._seq = 0
+
+    def start(self):
+        db = self.session_factory()
+        try:
+            _, self._seq = changed_ids(db, 0, 0)
+        finally:
+            db.close()
+        threading.Thread(target=self._run, name="change-relay", daemon=True).start()
+
+    def notify(self):
+        """data_version.on_change listener; may run on the event loop, so it only flags"""
+        self._pending.set()
+
+    def _run(self):
+        while True:
+            self._pending.wait(self.interval)
+            try:
+                if broadcaster.subscriber_count:
+                    self.sync()
+                if self._pending.is_set():
+                    self._pending.clear()
+                    self._publish()
+            except Exception as e:
+                print(f"Warning: could not relay changes from other workers: {e}")
+
+    def _publish(self):
+        db = self.session_factory()
+        try:
+            # Advance even without subscribers, so a later event lists only newer ids
+            ids, self._seq = changed_ids(db, self._seq, RELAY_MAX_IDS)
+            # ids == []: the first sync after startup, nothing was written
+            if not broadcaster.subscriber_count or ids == []:
+                return
+            data = {"op": "sync"} if ids is None else {"op": "sync", "ids": ids}
+            data["stats"] = stats_store.snapshot(db)
+            broadcaster.publish("companies", data)
+        finally:
+            db.close()
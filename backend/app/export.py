@@ -0,0 +1,63 @@
+import csv
+import io
+from typing import Iterator
+
+from sqlalchemy import select
+
+from app.database import ReadSessionLocal
+from app.models import Company
+from app.serialization import COMPANY_COLUMNS, COMPANY_FIELDS, dumps
+
+BATCH_SIZE = 500
+
+
+def iter_company_rows(conditions: list, batch_size: int = BATCH_SIZE) -> Iterator[tuple]:
+    """Yield plain row tuples in id order, fetching one keyset batch at a time.
+
+    Uses its own session because the response streams after the request's
+    dependencies have been torn down.
+    """
+    id_index = COMPANY_FIELDS.index("id")
+    last_id = 0
+    db = ReadSessionLocal()
+    try:
+        while True:
+            stmt = (
+                select(*COMPANY_COLUMNS)
+                .where(*conditions, Company.id > last_id)
+                .order_by(Company.id)
+                .limit(batch_size)
+            )
+            rows = db.execute(stmt).all()
+            if not rows:
+                break
+            yield from rows
+            last_id = rows[-1][id_index]
+            # Release the read transaction between batches
+            db.rollback()
+    finally:
+        db.close()
+
+
+def ndjson_chunks(conditions: list, batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    lines = []
+    for row in iter_company_rows(conditions, batch_size):
+        lines.append(dumps(dict(zip(COMPANY_FIELDS, row))))
+        if len(lines) == batch_size:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def csv_chunks(conditions: list, batch_size: int = BATCH_SIZE) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COMPANY_FIELDS)
+    for i, row in enumerate(iter_company_rows(conditions, batch_size), start=1):
+        writer.writerow(row)
+        if i % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
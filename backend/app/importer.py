@@ -0,0 +1,150 @@
+"""Bulk import of company records.
+
+Shared by POST /api/companies/bulk and the command line:
+
+    python -m app.importer companies.csv
+    python -m app.importer companies.json --replace
+    python -m app.importer --sample --replace    # reset to the bundled seed data
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from typing import Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.branches import sync_branches
+from app.changes import record_changes
+from app.models import Company, company_branches
+from app.parsing import derived_columns
+from app.schemas import CompanyCreate
+from app.stats import stats_row_from_values, stats_store
+
+
+BATCH_SIZE = 1000
+
+
+def parse_json(body: bytes | str) -> list[dict]:
+    records = json.loads(body)
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("Expected a JSON array of company objects")
+    return records
+
+
+def parse_csv(body: bytes | str) -> list[dict]:
+    if isinstance(body, bytes):
+        body = body.decode("utf-8-sig")
+    return list(csv.DictReader(io.StringIO(body)))
+
+
+def _clean(record: dict) -> dict:
+    # CSV cells are strings; treat blanks as missing so optional fields stay None
+    return {
+        key.strip(): (value.strip() or None) if isinstance(value, str) else value
+        for key, value in record.items()
+        if key
+    }
+
+
+def validate_records(records: Iterable[dict]) -> tuple[list[dict], list[dict]]:
+    """Validate with CompanyCreate; returns (column values, per-row errors)"""
+    rows, errors = [], []
+    for number, record in enumerate(records, start=1):
+        try:
+            company = CompanyCreate.model_validate(_clean(record))
+        except ValidationError as e:
+            errors.append({
+                "row": number,
+                "errors": [
+                    {"field": ".".join(str(part) for part in err["loc"]), "message": err["msg"]}
+                    for err in e.errors()
+                ],
+            })
+            continue
+        values = company.model_dump()
+        values["process"] = values["process"] or "Completed"
+        values.update(derived_columns(values))
+        rows.append(values)
+    return rows, errors
+
+
+def import_companies(db: Session, records: Iterable[dict], replace: bool = False, strict: bool = False) -> dict:
+    """Insert valid records with batched executemany in a single transaction.
+
+    replace deletes existing companies first; strict inserts nothing when any
+    record fails validation.
+    """
+    rows, errors = validate_records(records)
+    if strict and errors:
+        return {"inserted": 0, "errors": errors}
+    if not rows and not replace:
+        return {"inserted": 0, "errors": errors}
+
+    try:
+        if replace:
+            record_changes(db, "delete", db.scalars(select(Company.id)).all())
+            db.execute(delete(company_branches))
+            db.execute(delete(Company))
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            ids = db.scalars(insert(Company).returning(Company.id, sort_by_parameter_order=True), batch).all()
+            sync_branches(db, zip(ids, (row["branches_allowed"] for row in batch)))
+            record_changes(db, "insert", ids, {row["season"] for row in batch})
+        with stats_store.lock:
+            if replace:
+                db.commit()
+                stats_store.invalidate()
+            else:
+                stats_store.commit(db, added=[stats_row_from_values(row) for row in rows])
+    except Exception:
+        db.rollback()
+        raise
+    return {"inserted": len(rows), "errors": errors}
+
+
+def load_file(path: str) -> list[dict]:
+    with open(path, "rb") as f:
+        body = f.read()
+    if path.lower().endswith(".csv"):
+        return parse_csv(body)
+    return parse_json(body)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import companies from JSON or CSV")
+    parser.add_argument("path", nargs="?", help="JSON array or CSV file with a header row")
+    parser.add_argument("--sample", action="store_true", help="import the bundled sample data instead of a file")
+    parser.add_argument("--replace", action="store_true", help="delete existing companies first")
+    parser.add_argument("--strict", action="store_true", help="import nothing if any row is invalid")
+    args = parser.parse_args(argv)
+    if bool(args.path) == args.sample:
+        parser.error("give either a file path or --sample")
+
+    from app.database import SessionLocal, init_db
+
+    if args.sample:
+        from app.seed import sample_data
+        records = sample_data
+    else:
+        records = load_file(args.path)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        report = import_companies(db, records, replace=args.replace, strict=args.strict)
+    finally:
+        db.close()
+
+    for error in report["errors"]:
+        details = "; ".join(f"{e['field']}: {e['message']}" for e in error["errors"])
+        print(f"Row {error['row']}: {details}", file=sys.stderr)
+    print(f"Imported {report['inserted']} companies ({len(report['errors'])} rejected)")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,54 @@
-from fastapi import FastAPI, Depends, HTTPException, Header
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request, Response
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import re
-from statistics import median
 
-from app.database import get_db, init_db
-from app.models import Company
-from app.schemas import Company as CompanySchema, CompanyCreate, CompanyUpdate
+from app.database import SessionLocal, engine, get_db, get_read_db, read_engine
+from app.models import Branch, Company, company_branches
+from app.schemas import (
+    Company as CompanySchema,
+    CompanyBulkUpdate,
+    CompanyCreate,
+    CompanySelection,
+    CompanyUpdate,
+    SearchHit,
+)
 from app.config import settings
+from app.parsing import SEASON_PATTERN, OfferCategory, derived_columns, season_for
+from app.stats import STATS_COLUMNS, StatsRow, stats_row, stats_store
+from app.queries import (
+    CompanyListParams,
+    InvalidCursor,
+    company_conditions,
+    finish_page,
+    plan_company_list,
+)
+from app.export import csv_chunks, ndjson_chunks
+from app.serialization import (
+    InvalidFields,
+    columnar_response,
+    field_columns,
+    json_response,
+    object_response,
+    select_fields,
+)
+from app.versioning import conditional_get, data_version
+from app.importer import import_companies, parse_csv, parse_json
+from app.search import search_companies
+from app.branches import CHUNK_SIZE, sync_branches, unlink_branches
+from app.changes import changes_since, compact_changes, record_changes
+from app.events import ChangeRelay, broadcaster, publish_change
+from app.analytics import GroupBy, grouped_cache, grouped_stats
+from app.metrics import MetricsMiddleware, render as render_metrics
+from app.querylog import QueryDiagnosticsMiddleware, query_log
+from app.snapshot import SnapshotWriter, write_snapshot
+from app.response_cache import ResponseCacheMiddleware, response_cache
+from app.coherence import CoherenceMiddleware, VersionMonitor, install_commit_hooks
+from app.seed import prepare_database
 
 app = FastAPI(title="Placement Tracker API")
 
@@ -26,6 +66,21 @@ github_pages_url = os.getenv("GITHUB_PAGES_URL")
 if github_pages_url:
     cors_origins.append(github_pages_url)
 
+# Cached response bytes; added before CORS so it sits inside it and never
+# stores origin-specific headers. Every write drops the cached versions.
+if settings.RESPONSE_CACHE_BYTES > 0:
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+    data_version.on_bump(response_cache.clear)
+    data_version.on_change(response_cache.clear)
+
+# Writes from other workers: outside the response cache so it never serves
+# a body from before them. The monitor drops the stats of the seasons they
+# touched; grouped stats are keyed by the version and need no hook.
+version_monitor = VersionMonitor(engine.url)
+if settings.SHARED_VERSION_CHECK:
+    install_commit_hooks()
+    app.add_middleware(CoherenceMiddleware, monitor=version_monitor)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -34,18 +89,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
+# Per-route latency, status and SQL timing for /api/metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Slow-query capture and N+1 detection for /api/debug/slow-queries
+if settings.QUERY_DIAGNOSTICS:
+    app.add_middleware(QueryDiagnosticsMiddleware)
+
+# Opt-in async reads: registered first so they take precedence over the sync handlers
+if settings.ASYNC_DB:
+    from app.async_api import router as async_router
+    app.include_router(async_router)
+
 @app.on_event("startup")
 async def startup_event():
-    init_db()
-    # Seed database if empty (important for fresh deployments)
-    try:
-        from app.seed import seed_database
-        seed_database()
-    except Exception as e:
-        # Don't fail startup if seeding fails, but log it
-        print(f"Warning: Could not seed database on startup: {e}")
+    # Migrate, seed and compact; with several workers this runs once beforehand instead
+    if settings.INIT_DB_ON_STARTUP:
+        prepare_database()
+    # Keep the static snapshot bundle in step with every write
+    if settings.SNAPSHOT_DIR:
+        writer = SnapshotWriter(SessionLocal, settings.SNAPSHOT_DIR, settings.SNAPSHOT_DELAY_SECONDS)
+        data_version.on_bump(writer.request)
+        writer.request()
+    # Pass other workers' writes on to this worker's /api/events clients
+    if settings.SHARED_VERSION_CHECK:
+        relay = ChangeRelay(version_monitor.sync, SessionLocal)
+        data_version.on_change(relay.notify)
+        relay.start()
 
 
 # Authorization dependency: require admin token for write operations
@@ -87,31 +161,284 @@ def get_db_info():
         "database_size_bytes": db_size,
         "current_working_directory": os.getcwd(),
         "is_cloud_environment": any(os.path.exists(p) for p in ["/opt/render/project/src", "/app"]),
+        "sqlite_profile": settings.SQLITE_PROFILE if db_type == "SQLite" else None,
+        "read_only_engine": settings.DB_READ_ENGINE and db_type == "SQLite",
     }
 
+@app.get("/api/debug/slow-queries", dependencies=[Depends(admin_required)])
+def get_slow_queries():
+    """Captured slow statements with their plans, and requests that repeated a statement"""
+    return {
+        "enabled": settings.QUERY_DIAGNOSTICS,
+        "threshold_ms": settings.SLOW_QUERY_MS,
+        "repeat_threshold": settings.N_PLUS_ONE_THRESHOLD,
+        **query_log.snapshot(),
+    }
+
+@app.delete("/api/debug/slow-queries", dependencies=[Depends(admin_required)])
+def clear_slow_queries():
+    query_log.clear()
+    return {"ok": True}
+
+@app.post("/api/snapshot", dependencies=[Depends(admin_required)])
+def create_snapshot(db: Session = Depends(get_read_db)):
+    """Write the static companies/stats bundle to SNAPSHOT_DIR now"""
+    if not settings.SNAPSHOT_DIR:
+        raise HTTPException(status_code=400, detail="SNAPSHOT_DIR is not configured")
+    try:
+        return write_snapshot(db, settings.SNAPSHOT_DIR)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error writing snapshot: {str(e)}")
+
+@app.get("/api/metrics")
+def get_metrics():
+    """Prometheus text exposition of request, SQL and connection pool metrics"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    pools = {"primary": engine.pool}
+    if read_engine is not engine:
+        pools["read"] = read_engine.pool
+    cache = response_cache.stats()
+    gauges = {"response_cache_entries": cache["entries"], "response_cache_bytes": cache["bytes"]}
+    return Response(render_metrics(pools, gauges), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/events")
+async def stream_events():
+    """Server-Sent Events: one "company" or "companies" event per committed write"""
+    subscriber = broadcaster.subscribe()
+    return StreamingResponse(
+        broadcaster.stream(subscriber),
+        media_type="text/event-stream",
+        # Stop nginx-style proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/api/companies", response_model=List[CompanySchema])
-def get_companies(skip: int = 0, limit: int = 1000, db: Session = Depends(get_db)):
-    companies = db.query(Company).offset(skip).limit(limit).all()
-    return companies
+def get_companies(
+    request: Request,
+    response: Response,
+    params: CompanyListParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    try:
+        fields = select_fields(params.fields)
+        plan = plan_company_list(params, field_columns(fields))
+    except (InvalidCursor, InvalidFields) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if plan.count_stmt is not None:
+        # Paged requests report the total so clients can render page controls
+        response.headers["X-Total-Count"] = str(db.scalar(plan.count_stmt))
+    rows, next_cursor = finish_page(db.execute(plan.stmt).all(), plan)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if params.format == "columnar":
+        return columnar_response(rows, response, fields)
+    # Plain rows encoded straight to JSON; same bytes as the response_model path
+    return json_response(rows, response, fields)
+
+@app.get("/api/companies/export")
+def export_companies(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    q: Optional[str] = None,
+    min_ctc: Optional[float] = Query(None, ge=0),
+    offer_type: Optional[str] = None,
+    process: Optional[str] = None,
+    offer_category: Optional[OfferCategory] = None,
+    ppo: Optional[bool] = None,
+    branch: Optional[str] = None,
+    season: Optional[str] = Query(None, pattern=SEASON_PATTERN),
+):
+    """Stream every matching company, fetched from the DB in batches"""
+    conditions = company_conditions(
+        q=q,
+        min_ctc=min_ctc,
+        offer_type=offer_type,
+        process=process,
+        offer_category=offer_category,
+        ppo=ppo,
+        branch=branch,
+        season=season,
+    )
+    if format == "csv":
+        chunks, media_type = csv_chunks(conditions), "text/csv; charset=utf-8"
+    else:
+        chunks, media_type = ndjson_chunks(conditions), "application/x-ndjson"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="companies.{format}"'},
+    )
+
+@app.post("/api/companies/bulk", dependencies=[Depends(admin_required)])
+async def bulk_import_companies(request: Request, strict: bool = False, db: Session = Depends(get_db)):
+    """Import a JSON array or CSV (Content-Type: text/csv) of companies in one transaction"""
+    body = await request.body()
+    try:
+        if "csv" in request.headers.get("content-type", ""):
+            records = parse_csv(body)
+        else:
+            records = parse_json(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse upload: {str(e)}")
+    try:
+        report = await run_in_threadpool(import_companies, db, records, strict=strict)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing companies: {str(e)}")
+    if report["inserted"]:
+        await run_in_threadpool(notify_committed, db, "companies", "insert", count=report["inserted"])
+    return report
+
+def notify_committed(db: Session, event: str, op: str, **payload):
+    """Bump the data version and broadcast a committed write.
+
+    The write is already saved, so a failure here is logged rather than
+    turned into an error response.
+    """
+    try:
+        data_version.bump()
+    except Exception as e:
+        print(f"Warning: could not bump data version after {event} {op}: {e}")
+    try:
+        publish_change(db, event, op, **payload)
+    except Exception as e:
+        print(f"Warning: could not publish {event} {op}: {e}")
+
+def _selection_conditions(selection: CompanySelection) -> list:
+    conditions = []
+    if selection.ids is not None:
+        conditions.append(Company.id.in_(selection.ids))
+    if selection.filter is not None:
+        conditions += company_conditions(**selection.filter.dict())
+    if not conditions and not selection.all:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide ids and/or a non-empty filter, or set all to true to select every company",
+        )
+    return conditions
+
+@app.patch("/api/companies/bulk", dependencies=[Depends(admin_required)])
+def bulk_update_companies(payload: CompanyBulkUpdate, db: Session = Depends(get_db)):
+    """Apply one set of changes to every selected company, one UPDATE per chunk of ids"""
+    conditions = _selection_conditions(payload)
+    changes = payload.changes.dict(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    changes.update(derived_columns(changes))
+    if "season" in changes and not changes["season"]:
+        # Without a new notification_date there is no season to fall back to
+        raise HTTPException(status_code=400, detail="season cannot be cleared in bulk")
+    try:
+        before = db.execute(select(Company.id, *STATS_COLUMNS).where(*conditions).order_by(Company.id)).all()
+        ids = [row.id for row in before]
+        updated = []
+        # Chunked: a filter can select more rows than SQLite allows bound parameters
+        for start in range(0, len(ids), CHUNK_SIZE):
+            chunk = ids[start:start + CHUNK_SIZE]
+            db.execute(
+                update(Company).where(Company.id.in_(chunk)).values(**changes),
+                execution_options={"synchronize_session": False},
+            )
+            updated += db.scalars(select(Company).where(Company.id.in_(chunk)).order_by(Company.id)).all()
+        if ids:
+            if "branches_allowed" in changes:
+                sync_branches(db, [(company_id, changes["branches_allowed"]) for company_id in ids])
+            seasons = {row.season for row in before} | ({changes["season"]} if "season" in changes else set())
+            record_changes(db, "update", ids, seasons)
+        added = [stats_row(c) for c in updated]
+        result = [CompanySchema.model_validate(c) for c in updated]
+        stats_store.commit(db, removed=[StatsRow(*row[1:]) for row in before], added=added)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error updating companies: {str(e)}")
+    if ids:
+        notify_committed(db, "companies", "update", ids=ids)
+    return {"updated": len(result), "companies": result}
+
+@app.delete("/api/companies/bulk", dependencies=[Depends(admin_required)])
+def bulk_delete_companies(selection: CompanySelection, db: Session = Depends(get_db)):
+    """Delete every selected company, one DELETE per chunk of ids"""
+    conditions = _selection_conditions(selection)
+    try:
+        deleted = db.scalars(select(Company).where(*conditions).order_by(Company.id)).all()
+        removed = [stats_row(c) for c in deleted]
+        result = [CompanySchema.model_validate(c) for c in deleted]
+        if deleted:
+            unlink_branches(db, [c.id for c in deleted])
+            record_changes(db, "delete", [c.id for c in deleted], {c.season for c in deleted})
+            ids = [c.id for c in deleted]
+            for start in range(0, len(ids), CHUNK_SIZE):
+                db.execute(
+                    delete(Company).where(Company.id.in_(ids[start:start + CHUNK_SIZE])),
+                    execution_options={"synchronize_session": False},
+                )
+        stats_store.commit(db, removed=removed)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error deleting companies: {str(e)}")
+    if result:
+        notify_committed(db, "companies", "delete", ids=[c.id for c in result])
+    return {"deleted": len(result), "companies": result}
+
+@app.get("/api/companies/changes")
+def get_company_changes(
+    since: int = Query(0, ge=0, description="The `next` value from the previous sync; 0 for a full sync"),
+    limit: int = Query(1000, ge=1, le=5000),
+    db: Session = Depends(get_read_db),
+):
+    """Net inserts/updates (full rows) and deletes (tombstones) since a change-log sequence"""
+    try:
+        return changes_since(db, since, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading changes: {str(e)}")
+
+@app.post("/api/companies/changes/compact", dependencies=[Depends(admin_required)])
+def compact_company_changes(db: Session = Depends(get_db)):
+    """Keep only the newest change per company and purge expired tombstones"""
+    try:
+        return compact_changes(db, settings.CHANGE_LOG_TOMBSTONE_DAYS)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error compacting changes: {str(e)}")
 
 @app.get("/api/companies/{company_id}", response_model=CompanySchema)
-def get_company(company_id: int, db: Session = Depends(get_db)):
-    company = db.query(Company).filter(Company.id == company_id).first()
-    if not company:
+def get_company(
+    company_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    db: Session = Depends(get_read_db),
+):
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    try:
+        names = select_fields(fields)
+    except InvalidFields as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    row = db.execute(select(*field_columns(names)).where(Company.id == company_id)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Company not found")
-    return company
+    return object_response(row, response, names)
 
 @app.post("/api/companies", response_model=CompanySchema, dependencies=[Depends(admin_required)])
 def create_company(company: CompanyCreate, db: Session = Depends(get_db)):
     try:
-        db_company = Company(**company.dict())
+        data = company.dict()
+        db_company = Company(**{**data, **derived_columns(data)})
         db.add(db_company)
-        db.commit()
+        db.flush()
+        sync_branches(db, [(db_company.id, db_company.branches_allowed)])
+        record_changes(db, "insert", [db_company.id], [db_company.season])
+        stats_store.commit(db, added=[stats_row(db_company)])
         db.refresh(db_company)
-        return db_company
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating company: {str(e)}")
+    notify_committed(db, "company", "insert", company=db_company)
+    return db_company
 
 @app.put("/api/companies/{company_id}", response_model=CompanySchema, dependencies=[Depends(admin_required)])
 def update_company(company_id: int, company: CompanyUpdate, db: Session = Depends(get_db)):
@@ -120,18 +447,32 @@ def update_company(company_id: int, company: CompanyUpdate, db: Session = Depend
         if not db_company:
             raise HTTPException(status_code=404, detail="Company not found")
         
+        before = stats_row(db_company)
         update_data = company.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_company, field, value)
+        derived = derived_columns(update_data)
+        if "season" not in update_data and update_data.get("notification_date") == before.notification_date:
+            # Re-sending the same date (as the edit form does) keeps a season override
+            derived.pop("season", None)
+        for field, value in derived.items():
+            setattr(db_company, field, value)
+        if not db_company.season:
+            # season: null drops an override
+            db_company.season = season_for(db_company.notification_date)
+        if "branches_allowed" in update_data:
+            sync_branches(db, [(db_company.id, db_company.branches_allowed)])
+        record_changes(db, "update", [db_company.id], [before.season, db_company.season])
         
-        db.commit()
+        stats_store.commit(db, removed=[before], added=[stats_row(db_company)])
         db.refresh(db_company)
-        return db_company
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating company: {str(e)}")
+    notify_committed(db, "company", "update", company=db_company)
+    return db_company
 
 @app.delete("/api/companies/{company_id}", dependencies=[Depends(admin_required)])
 def delete_company(company_id: int, db: Session = Depends(get_db)):
@@ -140,14 +481,18 @@ def delete_company(company_id: int, db: Session = Depends(get_db)):
         if not db_company:
             raise HTTPException(status_code=404, detail="Company not found")
         
+        before = stats_row(db_company)
+        unlink_branches(db, [db_company.id])
+        record_changes(db, "delete", [db_company.id], [before.season])
         db.delete(db_company)
-        db.commit()
-        return {"message": "Company deleted successfully"}
+        stats_store.commit(db, removed=[before])
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error deleting company: {str(e)}")
+    notify_committed(db, "company", "delete", id=company_id)
+    return {"message": "Company deleted successfully"}
 
 def extract_ctc_value(text: str) -> float | None:
     """Extract CTC value from text like 'CTC: ₹12,50,000' or 'Fixed - 1150000'"""
@@ -186,141 +531,95 @@ def extract_stipend_value(text: str) -> float | None:
     return None
 
 @app.get("/api/stats")
-def get_stats(db: Session = Depends(get_db)):
-    companies = db.query(Company).all()
-
-    def parse_amount(token: str) -> float | None:
-        if not token:
-            return None
-        t = token.replace(",", "").strip().lower()
-        m = re.match(r"^(\d+(?:\.\d+)?)(k)?$", t)
-        if not m:
-            return None
-        val = float(m.group(1))
-        if m.group(2):
-            val *= 1000
-        return val
-
-    def find_amount(pattern: str, text: str) -> float | None:
-        m = re.search(pattern, text, flags=re.I)
-        if not m:
-            return None
-        raw = m.group(1)
-        # support tokens like 35k
-        if re.search(r"\d\s*[kK]", raw):
-            raw = raw.replace(" ", "")
-        return parse_amount(raw)
-
-    if not companies:
-        return {
-            "total_unique_companies": 0,
-            "on_campus": 0,
-            "ppo": 0,
-            "average_stipend": 0,
-            "average_ctc": 0,
-            "median_ctc": 0,
-            "average_ctc_weighted": 0,
-            "students_selected": 0,
-            "intern_count": 0,
-            "fte_count": 0,
-            "intern_fte_count": 0,
-        }
-
-    # Unique companies and PPO
-    unique_companies = set(c.company_name for c in companies)
-    total_unique = len(unique_companies)
-    ppo_count = len(
-        set(c.company_name for c in companies if "PPO" in c.type_of_offer.upper())
-    )
-    on_campus_count = total_unique - ppo_count
-
-    stipend_weighted: list[tuple[float, int]] = []
-    ctc_simple: list[float] = []
-    fixed_weighted: list[tuple[float, int]] = []
-
-    for c in companies:
-        text = (c.ctc_stipend or "").strip()
-
-        # Stipend parsing: explicit only; include zeros only when explicitly 0
-        stipend = None
-        # Stipend: ₹1,00,000 or Stipend - 35k fixed
-        stipend = find_amount(r"Stipend\s*[:\-]\s*₹?\s*([\d,]+(?:\.\d+)?|\d+(?:\.\d+)?\s*[kK])", text)
-        if stipend is None:
-            # sometimes just 'Stipend' line with amount after space
-            stipend = find_amount(r"Stipend\s*₹?\s*([\d,]+(?:\.\d+)?|\d+(?:\.\d+)?\s*[kK])", text)
-        if stipend is not None:
-            stipend_weighted.append((stipend, c.students_selected))
-
-        # CTC parsing: CTC: ₹x
-        ctc = find_amount(r"CTC\s*[:\-]\s*₹?\s*([\d,]+(?:\.\d+)?|\d+(?:\.\d+)?\s*[kK])", text)
-        if ctc is not None:
-            ctc_simple.append(ctc)
-
-        # Fixed parsing: Fixed - amount OR Fixed - same as CTC
-        fixed_match = re.search(r"Fixed\s*[-:]\s*(same as CTC|₹?\s*[\d,]+(?:\.\d+)?|\d+(?:\.\d+)?\s*[kK])", text, flags=re.I)
-        fixed_val = None
-        if fixed_match:
-            fixed_raw = fixed_match.group(1)
-            if isinstance(fixed_raw, str) and fixed_raw.strip().lower().startswith("same"):
-                fixed_val = ctc
-            else:
-                fixed_val = parse_amount(fixed_raw)
-        # If no explicit Fixed but only CTC given, do not assume Fixed; keep None
-        if fixed_val is not None:
-            fixed_weighted.append((fixed_val, c.students_selected))
-
-    def weighted_avg(pairs: list[tuple[float, int]]) -> float:
-        if not pairs:
-            return 0.0
-        total_value = sum(v * w for v, w in pairs)
-        total_weight = sum(w for _, w in pairs)
-        return (total_value / total_weight) if total_weight > 0 else 0.0
-
-    def simple_avg(values: list[float]) -> float:
-        if not values:
-            return 0.0
-        return sum(values) / len(values)
-
-    # Count students by type
-    intern_count = sum(
-        c.students_selected
-        for c in companies
-        if "intern" in c.type_of_offer.lower() and "fte" not in c.type_of_offer.lower()
-    )
-    fte_count = sum(
-        c.students_selected
-        for c in companies
-        if "fte" in c.type_of_offer.lower() and "intern" not in c.type_of_offer.lower()
-    )
-    intern_fte_count = sum(
-        c.students_selected
-        for c in companies
-        if (
-            "intern+fte" in c.type_of_offer.lower()
-            or ("intern" in c.type_of_offer.lower() and "fte" in c.type_of_offer.lower())
-        )
+def get_stats(
+    request: Request,
+    response: Response,
+    season: Optional[str] = Query(
+        None, pattern=SEASON_PATTERN, description="Placement season, e.g. 2025-26; all seasons when omitted"
+    ),
+    db: Session = Depends(get_read_db),
+):
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    if settings.STATS_CONSISTENCY_CHECK:
+        report = stats_store.check(db, season)
+        if not report["consistent"]:
+            print(f"Warning: incremental stats drifted on {report['mismatches']}; rebuilding")
+            stats_store.invalidate()
+        return report["recomputed"]
+    return stats_store.snapshot(db, season)
+
+@app.get("/api/stats/grouped")
+def get_grouped_stats(
+    request: Request,
+    response: Response,
+    by: GroupBy = Query(...),
+    db: Session = Depends(get_read_db),
+):
+    """Per-group counts, students selected and average/median CTC and stipend"""
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    version = data_version.current().number
+    groups = grouped_cache.get(by, version)
+    if groups is None:
+        try:
+            groups = grouped_stats(db, by)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error computing grouped stats: {str(e)}")
+        grouped_cache.put(by, version, groups)
+    return {"by": by, "groups": groups}
+
+@app.get("/api/stats/distribution")
+def get_stats_distribution(
+    request: Request,
+    response: Response,
+    year: Optional[int] = Query(None, description="Notification year; all years merged when omitted"),
+    season: Optional[str] = Query(None, pattern=SEASON_PATTERN, description="Placement season, e.g. 2025-26"),
+    db: Session = Depends(get_read_db),
+):
+    """CTC, Fixed and stipend percentiles and histograms from the streaming sketches"""
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    return stats_store.distribution(db, year, season)
+
+@app.get("/api/stats/consistency", dependencies=[Depends(admin_required)])
+def check_stats_consistency(
+    season: Optional[str] = Query(None, pattern=SEASON_PATTERN),
+    db: Session = Depends(get_read_db),
+):
+    """Compare the incrementally maintained stats with a full recompute"""
+    return stats_store.check(db, season)
+
+@app.get("/api/search", response_model=List[SearchHit])
+def search(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """Ranked prefix search over company names, job roles and branches"""
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    try:
+        return search_companies(db, q, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching companies: {str(e)}")
+
+@app.get("/api/branches")
+def list_branches(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """Canonical branches with the number of companies open to each"""
+    not_modified = conditional_get(request, response)
+    if not_modified:
+        return not_modified
+    stmt = (
+        select(Branch.code, Branch.name, func.count(company_branches.c.company_id).label("companies"))
+        .outerjoin(company_branches, company_branches.c.branch_id == Branch.id)
+        .group_by(Branch.id, Branch.code, Branch.name)
+        .order_by(Branch.code)
     )
-
-    total_students = sum(c.students_selected for c in companies)
-
-    # Median package secured: use Fixed values median when available
-    fixed_values_only = [v for v, _ in fixed_weighted]
-    median_package = median(fixed_values_only) if fixed_values_only else 0.0
-
-    return {
-        "total_unique_companies": total_unique,
-        "on_campus": on_campus_count,
-        "ppo": ppo_count,
-        # Weighted average stipend across entries that explicitly report stipend
-        "average_stipend": weighted_avg(stipend_weighted),
-        # Average CTC as simple mean of explicit CTC amounts
-        "average_ctc": simple_avg(ctc_simple),
-        # Median package secured: based on Fixed values
-        "median_ctc": median_package,
-        # Average package secured (weighted): use Fixed values
-        "average_ctc_weighted": weighted_avg(fixed_weighted),
-        "students_selected": total_students,
-        "intern_count": intern_count,
-        "fte_count": fte_count,
-        "intern_fte_count": intern_fte_count,
-    }
+    return [dict(row._mapping) for row in db.execute(stmt).all()]
@@ -0,0 +1,246 @@
+"""Request and database metrics in Prometheus text format (/api/metrics).
+
+MetricsMiddleware times every request by route template and status;
+SQLAlchemy cursor events count queries and database time, attributed to the
+current request through a context variable (sync handlers run in the
+threadpool, which copies the context). Everything is plain counters behind
+one lock, so recording costs a few dictionary updates per request and query.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Requests that did not match a route share one label to keep cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Cumulative-bucket histogram; callers hold the registry lock"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        # bisect_left: a value equal to a bound belongs to that bucket (le="bound")
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    """Database work done while serving one request"""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[str, tuple[str, tuple, tuple, dict]] = {}
+        self._counters: dict[str, tuple[str, tuple, dict]] = {}
+        self._gauges: dict[str, tuple[str, tuple, dict]] = {}
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self._histograms[name] = (help, labels, buckets, {})
+
+    def counter(self, name: str, help: str, labels: tuple = ()):
+        self._counters[name] = (help, labels, {})
+
+    def gauge(self, name: str, help: str, labels: tuple = ()):
+        self._gauges[name] = (help, labels, {})
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        _, _, buckets, series = self._histograms[name]
+        with self._lock:
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, labels: tuple = (), amount: float = 1):
+        _, _, series = self._counters[name]
+        with self._lock:
+            series[labels] = series.get(labels, 0) + amount
+
+    def add_gauge(self, name: str, amount: float, labels: tuple = ()):
+        _, _, series = self._gauges[name]
+        with self._lock:
+            series[labels] = series.get(labels, 0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: tuple = ()):
+        _, _, series = self._gauges[name]
+        with self._lock:
+            series[labels] = value
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (help, label_names, series) in self._counters.items():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+                for values, total in sorted(series.items()):
+                    lines.append(f"{name}{_labels(label_names, values)} {_number(total)}")
+            for name, (help, label_names, series) in self._gauges.items():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+                for values, value in sorted(series.items()):
+                    lines.append(f"{name}{_labels(label_names, values)} {_number(value)}")
+            for name, (help, label_names, buckets, series) in self._histograms.items():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+                for values, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        le = f'le="{bound}"'
+                        lines.append(f"{name}_bucket{_labels(label_names, values, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(label_names, values)} {_number(histogram.sum)}")
+                    lines.append(f"{name}_count{_labels(label_names, values)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+ROUTE = ("method", "route")
+registry.counter("http_requests_total", "Requests served, by route and status code", ROUTE + ("status",))
+registry.gauge("http_requests_in_flight", "Requests currently being served")
+registry.histogram("http_request_duration_seconds", "Time from receiving a request to sending the last byte", ROUTE)
+registry.histogram("http_request_db_queries", "SQL statements executed per request", ROUTE, QUERY_COUNT_BUCKETS)
+registry.histogram("http_request_db_seconds", "Time spent in SQL statements per request", ROUTE)
+registry.counter("db_queries_total", "SQL statements executed")
+registry.histogram("db_query_duration_seconds", "Time per SQL statement", (), QUERY_BUCKETS)
+registry.histogram("db_pool_checkout_seconds", "Time waiting for a pooled connection", ("pool",), POOL_WAIT_BUCKETS)
+registry.gauge("db_pool_checked_out", "Connections currently checked out", ("pool",))
+registry.gauge("db_pool_size", "Configured pool size", ("pool",))
+registry.counter("response_cache_requests_total", "Cacheable GETs served from (hit) or added to (miss) the response cache", ("result",))
+registry.gauge("response_cache_entries", "Responses held in the response cache")
+registry.gauge("response_cache_bytes", "Body bytes (all encodings) held in the response cache")
+
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE) if route is not None else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses pass through untouched"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        registry.add_gauge("http_requests_in_flight", 1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.add_gauge("http_requests_in_flight", -1)
+            current_request.reset(token)
+            labels = (scope["method"], route_label(scope))
+            registry.inc("http_requests_total", labels + (str(status),))
+            registry.observe("http_request_duration_seconds", elapsed, labels)
+            registry.observe("http_request_db_queries", stats.queries, labels)
+            registry.observe("http_request_db_seconds", stats.db_seconds, labels)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    registry.inc("db_queries_total")
+    registry.observe("db_query_duration_seconds", elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def install_query_metrics():
+    """Time every SQL statement on every engine (sync and the async engines' sync side)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited (including connecting)"""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            registry.observe("db_pool_checkout_seconds", time.perf_counter() - start, (self.metrics_name,))
+
+
+def timed_pool(name: str) -> type:
+    """A TimedQueuePool subclass whose samples are labelled pool=name"""
+    return type(f"TimedQueuePool_{name}", (TimedQueuePool,), {"metrics_name": name})
+
+
+def render(pools: dict, gauges: dict | None = None) -> str:
+    """The registry plus point-in-time gauges: pools as {name: Pool}, others as {metric: value}"""
+    for name, pool in pools.items():
+        if isinstance(pool, QueuePool):
+            registry.set_gauge("db_pool_checked_out", pool.checkedout(), (name,))
+            registry.set_gauge("db_pool_size", pool.size(), (name,))
+    for name, value in (gauges or {}).items():
+        registry.set_gauge(name, value)
+    return registry.render()
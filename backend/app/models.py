@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Float, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Date, Float, Table, Text, Index, false, func
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -7,7 +7,7 @@ class Company(Base):
     __tablename__ = "companies"
     
     id = Column(Integer, primary_key=True, index=True)
-    notification_date = Column(Date, nullable=False)
+    notification_date = Column(Date, nullable=False, index=True)
     company_name = Column(String(255), nullable=False)
     type_of_offer = Column(String(100), nullable=False)
     branches_allowed = Column(Text)
@@ -17,4 +17,69 @@ class Company(Base):
     students_selected = Column(Integer, nullable=False)
     # New: tracking recruitment process status (Completed/Pending)
     process = Column(String(20), nullable=False, default="Completed", server_default="Completed")
+    # Amounts parsed from ctc_stipend at write time (see app.parsing)
+    ctc_amount = Column(Float)
+    stipend_amount = Column(Float)
+    fixed_amount = Column(Float)
+    # Classification of type_of_offer at write time (see app.parsing.classify_offer)
+    offer_category = Column(String(16), nullable=False, default="other", server_default="other", index=True)
+    is_ppo = Column(Boolean, nullable=False, default=False, server_default=false(), index=True)
+    # Placement season, e.g. "2025-26": from notification_date unless overridden (see app.parsing.season_for)
+    season = Column(String(7), nullable=False)
 
+    __table_args__ = (
+        # Per-season reads (list, stats) touch only that season's rows
+        Index("ix_companies_season_date", "season", "notification_date", "id"),
+        Index("ix_companies_season_category", "season", "offer_category"),
+        Index("ix_companies_season_name", "season", "company_name"),
+    )
+
+
+# CTC used for filtering and sorting: explicit CTC, else Fixed (as the dashboard shows it)
+ctc_value = func.coalesce(Company.ctc_amount, Company.fixed_amount)
+
+Index("ix_companies_ctc_value", ctc_value)
+
+
+class Branch(Base):
+    __tablename__ = "branches"
+
+    id = Column(Integer, primary_key=True)
+    # Canonical code from app.parsing.canonical_branches, e.g. "CSE", "MECH", "ALL"
+    code = Column(String(32), nullable=False, unique=True)
+    name = Column(String(100), nullable=False)
+
+
+# Which branches each company is open to; kept in sync with branches_allowed
+company_branches = Table(
+    "company_branches",
+    Base.metadata,
+    Column("company_id", Integer, ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True),
+    Column("branch_id", Integer, ForeignKey("branches.id"), primary_key=True),
+    # Branch filters look up companies by branch
+    Index("ix_company_branches_branch", "branch_id", "company_id"),
+)
+
+
+class CompanyChange(Base):
+    """Change log behind /api/companies/changes; deletes stay as tombstones"""
+    __tablename__ = "company_changes"
+    __table_args__ = (
+        # "Is there a newer entry for this company?" probes during sync and compaction
+        Index("ix_company_changes_company_seq", "company_id", "seq"),
+        # Never reuse a sequence number, even after the newest entries are purged
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    company_id = Column(Integer, nullable=False)
+    op = Column(String(8), nullable=False)  # insert, update or delete
+    changed_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
+
+
+class AppMeta(Base):
+    """Small named integers shared by every process, e.g. the change-log horizon"""
+    __tablename__ = "app_meta"
+
+    key = Column(String(64), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
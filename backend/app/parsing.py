@@ -0,0 +1,190 @@
+import re
+from datetime import date
+from typing import Literal, NamedTuple
+
+
+# Amount tokens look like "12,50,000", "12,49,999.99" or "35k"
+_AMOUNT = r"[\d,]+(?:\.\d+)?|\d+(?:\.\d+)?\s*[kK]"
+
+_STIPEND_RE = re.compile(r"Stipend\s*[:\-]\s*₹?\s*(" + _AMOUNT + r")", re.I)
+_STIPEND_LOOSE_RE = re.compile(r"Stipend\s*₹?\s*(" + _AMOUNT + r")", re.I)
+_CTC_RE = re.compile(r"CTC\s*[:\-]\s*₹?\s*(" + _AMOUNT + r")", re.I)
+_FIXED_RE = re.compile(r"Fixed\s*[-:]\s*(same as CTC|₹?\s*[\d,]+(?:\.\d+)?|\d+(?:\.\d+)?\s*[kK])", re.I)
+_TOKEN_RE = re.compile(r"^(\d+(?:\.\d+)?)(k)?$")
+_K_SUFFIX_RE = re.compile(r"\d\s*[kK]")
+
+
+class Compensation(NamedTuple):
+    ctc: float | None
+    stipend: float | None
+    fixed: float | None
+
+
+def parse_amount(token: str) -> float | None:
+    """Parse a single amount token like '12,50,000' or '35k'"""
+    if not token:
+        return None
+    t = token.replace(",", "").strip().lower()
+    m = _TOKEN_RE.match(t)
+    if not m:
+        return None
+    val = float(m.group(1))
+    if m.group(2):
+        val *= 1000
+    return val
+
+
+def _find_amount(pattern: re.Pattern, text: str) -> float | None:
+    m = pattern.search(text)
+    if not m:
+        return None
+    raw = m.group(1)
+    # support tokens like 35k
+    if _K_SUFFIX_RE.search(raw):
+        raw = raw.replace(" ", "")
+    return parse_amount(raw)
+
+
+def parse_compensation(text: str | None) -> Compensation:
+    """Extract CTC, stipend and fixed amounts from a free-text ctc_stipend value.
+
+    Amounts are only reported when stated explicitly; anything missing is None.
+    """
+    text = (text or "").strip()
+
+    # Stipend: ₹1,00,000 or Stipend - 35k fixed
+    stipend = _find_amount(_STIPEND_RE, text)
+    if stipend is None:
+        # sometimes just 'Stipend' line with amount after space
+        stipend = _find_amount(_STIPEND_LOOSE_RE, text)
+
+    # CTC: ₹x
+    ctc = _find_amount(_CTC_RE, text)
+
+    # Fixed - amount OR Fixed - same as CTC
+    fixed = None
+    fixed_match = _FIXED_RE.search(text)
+    if fixed_match:
+        fixed_raw = fixed_match.group(1)
+        if fixed_raw.strip().lower().startswith("same"):
+            fixed = ctc
+        else:
+            fixed = parse_amount(fixed_raw)
+    # If no explicit Fixed but only CTC given, do not assume Fixed; keep None
+
+    return Compensation(ctc=ctc, stipend=stipend, fixed=fixed)
+
+
+def compensation_columns(text: str | None) -> dict:
+    """Parsed amounts keyed by their Company column names"""
+    parsed = parse_compensation(text)
+    return {
+        "ctc_amount": parsed.ctc,
+        "stipend_amount": parsed.stipend,
+        "fixed_amount": parsed.fixed,
+    }
+
+
+OfferCategory = Literal["intern", "fte", "intern_fte", "other"]
+
+
+class OfferClass(NamedTuple):
+    category: str
+    is_ppo: bool
+
+
+def classify_offer(type_of_offer: str | None) -> OfferClass:
+    """Classify a free-text offer type like 'SLI + Performance Based PPO' in one pass"""
+    offer = (type_of_offer or "").lower()
+    has_intern = "intern" in offer
+    has_fte = "fte" in offer
+    if has_intern and has_fte:
+        category = "intern_fte"
+    elif has_intern:
+        category = "intern"
+    elif has_fte:
+        category = "fte"
+    else:
+        category = "other"
+    return OfferClass(category=category, is_ppo="ppo" in offer)
+
+
+def offer_columns(type_of_offer: str | None) -> dict:
+    """Offer classification keyed by its Company column names"""
+    offer = classify_offer(type_of_offer)
+    return {"offer_category": offer.category, "is_ppo": offer.is_ppo}
+
+
+# Placement seasons run July to June and are labelled like "2025-26"
+SEASON_START_MONTH = 7
+SEASON_PATTERN = r"^\d{4}-\d{2}$"
+
+
+def season_for(day: date) -> str:
+    """The placement season a notification date falls in: 2025-08-01 -> '2025-26'"""
+    start = day.year if day.month >= SEASON_START_MONTH else day.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def current_season() -> str:
+    return season_for(date.today())
+
+
+def derived_columns(values: dict) -> dict:
+    """Columns derived from whichever free-text source fields `values` sets"""
+    derived = {}
+    # An explicit season overrides the one implied by notification_date
+    if values.get("season"):
+        derived["season"] = values["season"]
+    elif values.get("notification_date") is not None:
+        derived["season"] = season_for(values["notification_date"])
+    if "ctc_stipend" in values:
+        derived.update(compensation_columns(values["ctc_stipend"]))
+    if "type_of_offer" in values:
+        derived.update(offer_columns(values["type_of_offer"]))
+    return derived
+
+
+# Branch eligibility: free-text spellings to canonical codes
+ALL_BRANCHES = "ALL"
+BRANCH_ALIASES = {
+    "cse": "CSE",
+    "cs": "CSE",
+    "computer science": "CSE",
+    "computer science and engineering": "CSE",
+    "ece": "ECE",
+    "electronics and communication": "ECE",
+    "electronics and communication engineering": "ECE",
+    "cce": "CCE",
+    "communication and computer engineering": "CCE",
+    "mech": "MECH",
+    "me": "MECH",
+    "mechanical": "MECH",
+    "mechanical engineering": "MECH",
+}
+BRANCH_NAMES = {
+    ALL_BRANCHES: "All branches",
+    "CSE": "Computer Science and Engineering",
+    "ECE": "Electronics and Communication Engineering",
+    "CCE": "Communication and Computer Engineering",
+    "MECH": "Mechanical Engineering",
+}
+# Blank or "N/A" eligibility means the drive was not restricted by branch
+_OPEN_TO_ALL = {"", "n/a", "na", "all", "all branches", "any", "open to all"}
+_BRANCH_SPLIT_RE = re.compile(r"[,;/|+]")
+
+
+def canonical_branches(text: str | None) -> list[str]:
+    """Canonical branch codes for a branches_allowed value, e.g. 'CSE, Mech' -> ['CSE', 'MECH']"""
+    value = (text or "").strip().lower()
+    if value in _OPEN_TO_ALL:
+        return [ALL_BRANCHES]
+    codes = []
+    for part in _BRANCH_SPLIT_RE.split(value):
+        token = " ".join(part.replace(".", "").replace("&", "and").split())
+        if not token:
+            continue
+        code = ALL_BRANCHES if token in _OPEN_TO_ALL else BRANCH_ALIASES.get(token, token.upper())
+        if code not in codes:
+            codes.append(code)
+    return codes or [ALL_BRANCHES]
@@ -0,0 +1,209 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Literal, NamedTuple, Optional
+
+from fastapi import Query
+from sqlalchemy import Select, select, func, tuple_
+
+from app.models import Branch, Company, company_branches, ctc_value
+from app.parsing import ALL_BRANCHES, SEASON_PATTERN, OfferCategory, canonical_branches
+
+
+# Columns the list endpoint can sort by; "ctc" sorts on the parsed CTC value
+SORT_COLUMNS = {
+    "id": Company.id,
+    "notification_date": Company.notification_date,
+    "company_name": Company.company_name,
+    "type_of_offer": Company.type_of_offer,
+    "branches_allowed": Company.branches_allowed,
+    "eligibility_cgpa": Company.eligibility_cgpa,
+    "job_roles": Company.job_roles,
+    "students_selected": Company.students_selected,
+    "process": Company.process,
+    "ctc": ctc_value,
+}
+
+SortKey = Literal[
+    "id",
+    "notification_date",
+    "company_name",
+    "type_of_offer",
+    "branches_allowed",
+    "eligibility_cgpa",
+    "job_roles",
+    "students_selected",
+    "process",
+    "ctc",
+]
+SortOrder = Literal["asc", "desc"]
+# columnar: column arrays with dictionary-encoded repeated strings (see serialization.to_columnar)
+ListFormat = Literal["json", "columnar"]
+
+
+def branch_condition(branch: str):
+    """Companies open to `branch` (any spelling), including drives open to all branches"""
+    codes = canonical_branches(branch) + [ALL_BRANCHES]
+    linked = (
+        select(company_branches.c.company_id)
+        .join(Branch, Branch.id == company_branches.c.branch_id)
+        .where(Branch.code.in_(codes))
+    )
+    return Company.id.in_(linked)
+
+
+def company_conditions(
+    q: str | None = None,
+    min_ctc: float | None = None,
+    offer_type: str | None = None,
+    process: str | None = None,
+    offer_category: str | None = None,
+    ppo: bool | None = None,
+    branch: str | None = None,
+    season: str | None = None,
+) -> list:
+    """WHERE clauses for the company list filters"""
+    conditions = []
+    if season:
+        conditions.append(Company.season == season)
+    if q:
+        conditions.append(Company.company_name.icontains(q.strip(), autoescape=True))
+    if min_ctc is not None:
+        conditions.append(ctc_value >= min_ctc)
+    if offer_type:
+        conditions.append(Company.type_of_offer.icontains(offer_type.strip(), autoescape=True))
+    if process:
+        conditions.append(Company.process == process)
+    if offer_category:
+        conditions.append(Company.offer_category == offer_category)
+    if ppo is not None:
+        conditions.append(Company.is_ppo == ppo)
+    if branch:
+        conditions.append(branch_condition(branch))
+    return conditions
+
+
+def company_order(sort: str | None = None, order: str = "asc") -> list:
+    """ORDER BY clauses; id breaks ties so pages are stable"""
+    if not sort:
+        return [Company.id]
+    column = SORT_COLUMNS[sort]
+    if order == "desc":
+        return [column.desc(), Company.id.desc()]
+    return [column.asc(), Company.id.asc()]
+
+
+def companies_select(conditions: list, sort: str | None = None, order: str = "asc", columns: list | None = None):
+    """Company entities, or plain rows of `columns` when given"""
+    stmt = select(*columns) if columns else select(Company)
+    return stmt.where(*conditions).order_by(*company_order(sort, order))
+
+
+def count_select(conditions: list):
+    return select(func.count()).select_from(Company).where(*conditions)
+
+
+# Keyset pagination walks (notification_date, id); the cursor is opaque to clients
+CURSOR_SORT = "notification_date"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(order: str, company) -> str:
+    """company: a Company or any row with notification_date and id"""
+    payload = json.dumps([order, company.notification_date.isoformat(), company.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        order, notification_date, company_id = json.loads(base64.urlsafe_b64decode(padded))
+        if order not in ("asc", "desc"):
+            raise ValueError(order)
+        return order, date.fromisoformat(notification_date), int(company_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def after_cursor(order: str, notification_date: date, company_id: int):
+    """WHERE clause selecting rows strictly after the cursor position"""
+    key = tuple_(Company.notification_date, Company.id)
+    if order == "desc":
+        return key < tuple_(notification_date, company_id)
+    return key > tuple_(notification_date, company_id)
+
+
+@dataclass
+class CompanyListParams:
+    """Query parameters of GET /api/companies (used as a dependency)"""
+    skip: int = Query(0, ge=0)
+    limit: int = Query(1000, ge=1)
+    q: Optional[str] = None
+    min_ctc: Optional[float] = Query(None, ge=0, description="Minimum CTC in rupees (CTC, else Fixed)")
+    offer_type: Optional[str] = None
+    offer_category: Optional[OfferCategory] = None
+    ppo: Optional[bool] = None
+    branch: Optional[str] = Query(None, description="Branch code or spelling, e.g. CSE or Mechanical")
+    season: Optional[str] = Query(None, pattern=SEASON_PATTERN, description="Placement season, e.g. 2025-26")
+    process: Optional[str] = None
+    sort: Optional[SortKey] = None
+    order: SortOrder = "asc"
+    page: int = Query(1, ge=1)
+    page_size: Optional[int] = Query(None, ge=1, le=1000)
+    cursor: Optional[str] = Query(None, description="Opaque X-Next-Cursor from a previous page")
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. company_name,notification_date,ctc_amount (id is always included)")
+    format: ListFormat = "json"
+
+
+class ListPlan(NamedTuple):
+    stmt: Select
+    # Set for page_size requests so the handler can report X-Total-Count
+    count_stmt: Select | None
+    size: int
+    order: str
+    # Keyset-capable ordering: stmt fetches one extra row to detect a next page
+    keyset: bool
+
+
+def plan_company_list(params: CompanyListParams, columns: list | None = None) -> ListPlan:
+    """Build the statements for one page of the company list; raises InvalidCursor"""
+    conditions = company_conditions(
+        q=params.q,
+        min_ctc=params.min_ctc,
+        offer_type=params.offer_type,
+        process=params.process,
+        offer_category=params.offer_category,
+        ppo=params.ppo,
+        branch=params.branch,
+        season=params.season,
+    )
+    sort, order = params.sort, params.order
+    size = params.page_size or params.limit
+    count_stmt = None
+    if params.cursor:
+        order, cursor_date, cursor_id = decode_cursor(params.cursor)
+        if sort not in (None, CURSOR_SORT):
+            raise InvalidCursor(f"Cursor pagination requires sort={CURSOR_SORT}")
+        sort = CURSOR_SORT
+        stmt = companies_select(conditions + [after_cursor(order, cursor_date, cursor_id)], sort, order, columns)
+    else:
+        stmt = companies_select(conditions, sort, order, columns)
+        if params.page_size:
+            count_stmt = count_select(conditions)
+            stmt = stmt.offset((params.page - 1) * params.page_size)
+        else:
+            stmt = stmt.offset(params.skip)
+    keyset = sort == CURSOR_SORT
+    return ListPlan(stmt.limit(size + 1 if keyset else size), count_stmt, size, order, keyset)
+
+
+def finish_page(companies: list, plan: ListPlan) -> tuple[list, str | None]:
+    """Trim the look-ahead row and return (page, next cursor)"""
+    if plan.keyset and len(companies) > plan.size:
+        companies = companies[:plan.size]
+        return companies, encode_cursor(plan.order, companies[-1])
+    return companies, None
@@ -0,0 +1,184 @@
+"""Slow-query log and N+1 detector (QUERY_DIAGNOSTICS=true).
+
+Every statement slower than SLOW_QUERY_MS is captured with its parameters,
+the route that issued it and the database's query plan (EXPLAIN QUERY PLAN
+on SQLite, EXPLAIN on PostgreSQL), so a filter that misses its index shows
+up as a SCAN / Seq Scan. Requests that run the same statement
+N_PLUS_ONE_THRESHOLD or more times are flagged as well. Both go to bounded
+ring buffers read by the admin /api/debug/slow-queries endpoint.
+"""
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+
+# Longest parameter / statement text kept per capture
+MAX_TEXT = 2000
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+FULL_SCAN_MARKERS = ("SCAN ", "Seq Scan")
+
+
+class RequestQueries:
+    """Statements issued while serving one request"""
+
+    __slots__ = ("scope", "counts")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.counts: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        # The router fills scope["route"] before the handler runs any query
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "")
+
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+class QueryLog:
+    def __init__(self, size: int):
+        self._lock = threading.Lock()
+        self.slow: deque = deque(maxlen=size)
+        self.repeated: deque = deque(maxlen=size)
+
+    def add_slow(self, entry: dict):
+        with self._lock:
+            self.slow.append(entry)
+
+    def add_repeated(self, entry: dict):
+        with self._lock:
+            self.repeated.append(entry)
+
+    def snapshot(self) -> dict:
+        """Newest first"""
+        with self._lock:
+            return {"slow": list(reversed(self.slow)), "repeated": list(reversed(self.repeated))}
+
+    def clear(self):
+        with self._lock:
+            self.slow.clear()
+            self.repeated.clear()
+
+
+query_log = QueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+
+def _truncate(text: str) -> str:
+    return text if len(text) <= MAX_TEXT else text[:MAX_TEXT] + "..."
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def explain(conn, statement: str, parameters, executemany: bool) -> list[str]:
+    """Query plan lines for statement, run on the same connection (and transaction)"""
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return []
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if dialect != "sqlite":
+        return [row[0] for row in rows]
+    # (id, parent, notused, detail): indent each step under its parent
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("diagnostics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["diagnostics_start"].pop()) * 1000
+    request = current_queries.get()
+    if request is not None:
+        request.counts[statement] += 1
+    if elapsed_ms < settings.SLOW_QUERY_MS:
+        return
+
+    entry = {
+        "at": _now(),
+        "duration_ms": round(elapsed_ms, 3),
+        "statement": _truncate(statement),
+        "parameters": _truncate(repr(parameters)),
+        "executemany": executemany,
+        "method": request.scope.get("method") if request else None,
+        "route": request.route if request else None,
+        "plan": [],
+        "full_scan": False,
+    }
+    if statement.lstrip()[:6].lower().startswith(EXPLAINABLE):
+        try:
+            entry["plan"] = explain(conn, statement, parameters, executemany)
+            entry["full_scan"] = any(marker in line for line in entry["plan"] for marker in FULL_SCAN_MARKERS)
+        except Exception as e:
+            entry["plan_error"] = str(e)
+    query_log.add_slow(entry)
+
+
+def _handle_error(context):
+    conn = context.connection
+    if conn is not None and conn.info.get("diagnostics_start"):
+        conn.info["diagnostics_start"].pop()
+
+
+def install_query_diagnostics():
+    """Capture slow statements on every engine"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+class QueryDiagnosticsMiddleware:
+    """Tracks statements per request and flags repeated ones (likely N+1 loops)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request = RequestQueries(scope)
+        token = current_queries.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_queries.reset(token)
+            total = sum(request.counts.values())
+            for statement, count in request.counts.items():
+                if count >= settings.N_PLUS_ONE_THRESHOLD:
+                    query_log.add_repeated({
+                        "at": _now(),
+                        "method": scope.get("method"),
+                        "route": request.route,
+                        "statement": _truncate(statement),
+                        "count": count,
+                        "request_queries": total,
+                    })
@@ -0,0 +1,221 @@
+"""Cache of final response bytes for the public read endpoints.
+
+Entries are keyed by path, query string and data version, and hold the
+encoded body plus gzip / brotli variants (compressed on first request for
+each), chosen by Accept-Encoding. A hit is a dict lookup and a socket write:
+no query, validation or JSON encoding. Every write bumps the data version,
+which drops all entries; the total size is bounded with LRU eviction.
+
+Runs inside the CORS middleware, so origin-specific headers are never cached.
+"""
+import gzip
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.metrics import registry
+from app.versioning import data_version
+
+try:
+    import brotli
+except ImportError:  # optional; clients asking for br get gzip instead
+    brotli = None
+
+
+# GET endpoints whose body depends only on the URL and the data version
+CACHEABLE_PATHS = frozenset({
+    "/api/companies",
+    "/api/stats",
+    "/api/stats/grouped",
+    "/api/stats/distribution",
+    "/api/search",
+    "/api/branches",
+})
+_COMPANY_DETAIL = re.compile(r"^/api/companies/\d+$")
+
+# Compressing tiny bodies costs more than it saves
+MIN_COMPRESS_BYTES = 512
+BROTLI_QUALITY = 5
+OFFLOAD_BYTES = 64 * 1024
+# Headers the cache sets itself for each variant
+_OWN_HEADERS = {b"content-length", b"content-encoding", b"vary"}
+
+
+def cacheable(scope) -> bool:
+    path = scope["path"]
+    return scope["method"] == "GET" and (path in CACHEABLE_PATHS or _COMPANY_DETAIL.match(path) is not None)
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """'br', 'gzip' or 'identity' for an Accept-Encoding header"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class CachedResponse:
+    __slots__ = ("headers", "route", "bodies", "size")
+
+    def __init__(self, headers: list, route, body: bytes):
+        self.headers = headers
+        # Lets metrics label a hit by its route template although routing was skipped
+        self.route = route
+        self.bodies = {"identity": body}
+        self.size = len(body)
+
+
+class CacheKey(NamedTuple):
+    path: str
+    query: bytes
+    version: int
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self.size = 0
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        registry.inc("response_cache_requests_total", ("hit" if entry is not None else "miss",))
+        return entry
+
+    def put(self, key: CacheKey, entry: CachedResponse):
+        if entry.size > self.max_bytes // 8:
+            # One huge body would evict everything else
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            self._entries[key] = entry
+            self.size += entry.size
+            self._evict()
+
+    def body(self, key: CacheKey, entry: CachedResponse, encoding: str) -> bytes:
+        """The entry's body in `encoding`, compressing (and accounting for) it once"""
+        body = entry.bodies.get(encoding)
+        if body is not None:
+            return body
+        body = _compress(entry.bodies["identity"], encoding)
+        with self._lock:
+            if encoding not in entry.bodies:
+                entry.bodies[encoding] = body
+                entry.size += len(body)
+                if self._entries.get(key) is entry:
+                    self.size += len(body)
+                    self._evict()
+        return body
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.size}
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_BYTES)
+
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not cacheable(scope):
+            return await self.app(scope, receive, send)
+
+        version = data_version.current()
+        key = CacheKey(scope["path"], scope["query_string"], version.number)
+        encoding = choose_encoding(_header(scope, b"accept-encoding"))
+        entry = self.cache.get(key)
+        if entry is not None:
+            scope["route"] = entry.route
+            if version.matches(Request(scope)):
+                headers = entry.headers + [(b"vary", b"Accept-Encoding")]
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await self._send(send, key, entry, encoding)
+            return
+
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] != 200:
+                    await send(message)
+                return
+            if start["status"] != 200:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body"):
+                return
+            headers = [(k, v) for k, v in start["headers"] if k not in _OWN_HEADERS]
+            entry = CachedResponse(headers, scope.get("route"), b"".join(chunks))
+            # A write that landed mid-request may be in the body; only cache a settled version
+            if data_version.current().number == version.number:
+                self.cache.put(key, entry)
+            await self._send(send, key, entry, encoding)
+
+        await self.app(scope, receive, capture)
+
+    async def _send(self, send, key: CacheKey, entry: CachedResponse, encoding: str):
+        if encoding != "identity" and len(entry.bodies["identity"]) < MIN_COMPRESS_BYTES:
+            encoding = "identity"
+        body = entry.bodies.get(encoding)
+        if body is None:
+            # First request for this encoding: keep big compressions off the event loop
+            if len(entry.bodies["identity"]) > OFFLOAD_BYTES:
+                body = await run_in_threadpool(self.cache.body, key, entry, encoding)
+            else:
+                body = self.cache.body(key, entry, encoding)
+        headers = entry.headers + [(b"content-length", str(len(body)).encode()), (b"vary", b"Accept-Encoding")]
+        if encoding != "identity":
+            headers.append((b"content-encoding", encoding.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
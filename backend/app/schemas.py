@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date
-from typing import Optional
+from typing import List, Optional
+
+from app.parsing import SEASON_PATTERN, OfferCategory
 
 class CompanyBase(BaseModel):
     notification_date: date
@@ -12,6 +14,8 @@ class CompanyBase(BaseModel):
     ctc_stipend: str
     students_selected: int
     process: Optional[str] = "Completed"
+    # e.g. "2025-26"; derived from notification_date when not given
+    season: Optional[str] = Field(None, pattern=SEASON_PATTERN)
 
 class CompanyCreate(CompanyBase):
     pass
@@ -26,10 +30,59 @@ class CompanyUpdate(CompanyBase):
     ctc_stipend: Optional[str] = None
     students_selected: Optional[int] = None
     process: Optional[str] = None
+    season: Optional[str] = Field(None, pattern=SEASON_PATTERN)
 
 class Company(CompanyBase):
     id: int
+    # Parsed from ctc_stipend on write; read-only
+    ctc_amount: Optional[float] = None
+    stipend_amount: Optional[float] = None
+    fixed_amount: Optional[float] = None
+    # Derived from type_of_offer on write; read-only
+    offer_category: Optional[str] = None
+    is_ppo: Optional[bool] = None
     
     class Config:
         from_attributes = True
 
+
+class CompanyFilter(BaseModel):
+    # A misspelled key must not widen a bulk write to every row
+    model_config = ConfigDict(extra="forbid")
+
+    q: Optional[str] = None
+    min_ctc: Optional[float] = None
+    offer_type: Optional[str] = None
+    offer_category: Optional[OfferCategory] = None
+    ppo: Optional[bool] = None
+    branch: Optional[str] = None
+    process: Optional[str] = None
+    season: Optional[str] = Field(None, pattern=SEASON_PATTERN)
+
+# Explicit ids per bulk request; each one is a bound parameter in the selection
+MAX_BULK_IDS = 500
+
+class CompanySelection(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    # Rows matching both ids and filter when both are given
+    ids: Optional[List[int]] = Field(None, max_length=MAX_BULK_IDS)
+    filter: Optional[CompanyFilter] = None
+    # Required to select every company; an empty selection is rejected otherwise
+    all: bool = False
+
+class CompanyBulkUpdate(CompanySelection):
+    changes: CompanyUpdate
+
+class SearchHit(BaseModel):
+    id: int
+    company_name: str
+    type_of_offer: str
+    notification_date: date
+    job_roles: str
+    branches_allowed: Optional[str] = None
+    ctc_amount: Optional[float] = None
+    # Lower is better; 0 for every hit when full-text search is unavailable
+    rank: float
+    # Best-matching fragment with matches wrapped in <mark>...</mark>
+    snippet: Optional[str] = None
@@ -0,0 +1,137 @@
+import re
+
+from sqlalchemy import or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Company
+
+
+# Searchable columns and their bm25 weights (a name match outranks a role match)
+SEARCH_COLUMNS = ("company_name", "job_roles", "branches_allowed")
+WEIGHTS = (10.0, 5.0, 1.0)
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+
+_SQLITE_DDL = [
+    # External-content table: the index lives here, the text stays in companies
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS companies_fts USING fts5(
+        company_name, job_roles, branches_allowed,
+        content='companies', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_fts_ai AFTER INSERT ON companies BEGIN
+        INSERT INTO companies_fts(rowid, company_name, job_roles, branches_allowed)
+        VALUES (new.id, new.company_name, new.job_roles, new.branches_allowed);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_fts_ad AFTER DELETE ON companies BEGIN
+        INSERT INTO companies_fts(companies_fts, rowid, company_name, job_roles, branches_allowed)
+        VALUES ('delete', old.id, old.company_name, old.job_roles, old.branches_allowed);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_fts_au AFTER UPDATE OF company_name, job_roles, branches_allowed ON companies BEGIN
+        INSERT INTO companies_fts(companies_fts, rowid, company_name, job_roles, branches_allowed)
+        VALUES ('delete', old.id, old.company_name, old.job_roles, old.branches_allowed);
+        INSERT INTO companies_fts(rowid, company_name, job_roles, branches_allowed)
+        VALUES (new.id, new.company_name, new.job_roles, new.branches_allowed);
+    END
+    """,
+]
+
+_PG_DOCUMENT = (
+    "to_tsvector('simple', coalesce(company_name, '') || ' ' || coalesce(job_roles, '') "
+    "|| ' ' || coalesce(branches_allowed, ''))"
+)
+
+# Set by install_search: "fts5", "tsvector" or "like" when neither is available
+search_backend = "like"
+
+
+def install_search(engine: Engine):
+    """Create the full-text index and its sync triggers if missing"""
+    global search_backend
+    try:
+        with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'companies_fts'")
+                ).first()
+                for ddl in _SQLITE_DDL:
+                    conn.execute(text(ddl))
+                if not exists:
+                    # Index the rows that predate the triggers
+                    conn.execute(text("INSERT INTO companies_fts(companies_fts) VALUES ('rebuild')"))
+                search_backend = "fts5"
+            elif engine.dialect.name == "postgresql":
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_companies_search ON companies USING GIN ({_PG_DOCUMENT})"))
+                search_backend = "tsvector"
+    except Exception as e:
+        # e.g. SQLite built without FTS5; /api/search falls back to LIKE scans
+        print(f"Warning: full-text search unavailable, using LIKE: {e}")
+        search_backend = "like"
+
+
+def search_terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())
+
+
+def _result_columns():
+    return [
+        Company.id,
+        Company.company_name,
+        Company.type_of_offer,
+        Company.notification_date,
+        Company.job_roles,
+        Company.branches_allowed,
+        Company.ctc_amount,
+    ]
+
+
+def search_companies(db: Session, q: str, limit: int = 20) -> list[dict]:
+    """Ranked, prefix-aware matches with highlighted snippets"""
+    terms = search_terms(q)
+    if not terms:
+        return []
+    columns = ", ".join(f"c.{col.key}" for col in _result_columns())
+
+    if search_backend == "fts5":
+        # Every term must match, each as a prefix: "data sci" finds "Data Science"
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(w) for w in WEIGHTS)
+        stmt = text(
+            f"SELECT {columns}, bm25(companies_fts, {weights}) AS rank, "
+            f"snippet(companies_fts, -1, :open, :close, '…', 12) AS snippet "
+            "FROM companies_fts JOIN companies c ON c.id = companies_fts.rowid "
+            "WHERE companies_fts MATCH :match ORDER BY rank LIMIT :limit"
+        )
+        params = {"match": match, "limit": limit, "open": HIGHLIGHT_OPEN, "close": HIGHLIGHT_CLOSE}
+    elif search_backend == "tsvector":
+        stmt = text(
+            f"SELECT {columns}, -ts_rank({_PG_DOCUMENT.replace('company_name', 'c.company_name')}, query) AS rank, "
+            f"ts_headline('simple', concat_ws(' · ', c.company_name, c.job_roles, c.branches_allowed), query, "
+            "'StartSel=' || :open || ', StopSel=' || :close || ', MaxWords=12, MinWords=4') AS snippet "
+            "FROM companies c, to_tsquery('simple', :match) query "
+            f"WHERE {_PG_DOCUMENT} @@ query ORDER BY rank LIMIT :limit"
+        )
+        params = {
+            "match": " & ".join(f"{term}:*" for term in terms),
+            "limit": limit,
+            "open": HIGHLIGHT_OPEN,
+            "close": HIGHLIGHT_CLOSE,
+        }
+    else:
+        conditions = [
+            or_(*(getattr(Company, col).icontains(term, autoescape=True) for col in SEARCH_COLUMNS))
+            for term in terms
+        ]
+        rows = db.execute(select(*_result_columns()).where(*conditions).order_by(Company.id).limit(limit)).all()
+        return [{**row._asdict(), "rank": 0.0, "snippet": None} for row in rows]
+
+    return [dict(row._mapping) for row in db.execute(stmt, params).all()]
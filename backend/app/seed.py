@@ -1,6 +1,8 @@
 from app.models import Company
-from app.database import SessionLocal
-from datetime import datetime, date
+from app.config import settings
+from app.changes import compact_changes
+from app.database import SessionLocal, init_db
+from app.importer import import_companies
 
 # Sample data
 sample_data = [
@@ -46,21 +48,9 @@ def seed_database():
             print("Database already contains data. Skipping seed.")
             return
         
-        # Add all companies
-        for item in sample_data:
-            # Create a copy to avoid modifying the original
-            company_data = item.copy()
-            # Convert date string to date object
-            if isinstance(company_data['notification_date'], str):
-                company_data['notification_date'] = datetime.strptime(company_data['notification_date'], '%Y-%m-%d').date()
-            # Ensure process field is set (default to "Completed")
-            if 'process' not in company_data:
-                company_data['process'] = "Completed"
-            company = Company(**company_data)
-            db.add(company)
-        
-        db.commit()
-        print(f"Successfully added {len(sample_data)} companies to the database!")
+        # Add all companies in one batched transaction
+        report = import_companies(db, sample_data)
+        print(f"Successfully added {report['inserted']} companies to the database!")
     except Exception as e:
         print(f"Error seeding database: {e}")
         import traceback
@@ -69,9 +59,24 @@ def seed_database():
     finally:
         db.close()
 
-if __name__ == "__main__":
-    # Initialize database first if running standalone
-    from app.database import init_db
+def prepare_database():
+    """Migrations, sample data and change-log compaction.
+
+    Run once per deployment: at app startup (INIT_DB_ON_STARTUP), or with
+    `python -m app.seed` before starting several workers, so they never race
+    on ALTER TABLE or DELETE.
+    """
     init_db()
+    # Seed database if empty (important for fresh deployments)
     seed_database()
+    # Keep the delta-sync change log compact
+    db = SessionLocal()
+    try:
+        compact_changes(db, settings.CHANGE_LOG_TOMBSTONE_DAYS)
+    except Exception as e:
+        print(f"Warning: Could not compact change log: {e}")
+    finally:
+        db.close()
 
+if __name__ == "__main__":
+    prepare_database()
@@ -0,0 +1,103 @@
+import json
+from datetime import date
+
+from fastapi import Response
+
+from app.models import Company
+from app.schemas import Company as CompanySchema
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib encoder produces the same bytes
+    orjson = None
+
+
+# Response fields, in schema order, and the table columns that back them
+COMPANY_FIELDS = list(CompanySchema.model_fields)
+COMPANY_COLUMNS = [Company.__table__.c[field] for field in COMPANY_FIELDS]
+# Always selected for projections: encode_cursor reads them from the last row
+CURSOR_FIELDS = ("notification_date", "id")
+# Short, heavily repeated text columns; format=columnar sends them dictionary-encoded
+DICTIONARY_FIELDS = frozenset({
+    "type_of_offer",
+    "branches_allowed",
+    "eligibility_cgpa",
+    "process",
+    "season",
+    "offer_category",
+})
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(value) -> bytes:
+    """Compact UTF-8 JSON, byte-identical to FastAPI's own encoding"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def rows_to_dicts(rows, fields: list[str] = COMPANY_FIELDS) -> list[dict]:
+    """Plain row tuples (selected with COMPANY_COLUMNS, or field_columns(fields)) to response dicts"""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def select_fields(fields: str | None) -> list[str]:
+    """Response fields for a comma-separated `fields` parameter, in schema order; id is always kept"""
+    if not fields:
+        return COMPANY_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(COMPANY_FIELDS)
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in COMPANY_FIELDS if name == "id" or name in requested]
+
+
+def field_columns(fields: list[str]) -> list:
+    """Columns to select for fields, then any the keyset cursor needs (dropped when encoding)"""
+    names = fields + [name for name in CURSOR_FIELDS if name not in fields]
+    return [Company.__table__.c[name] for name in names]
+
+
+def to_columnar(rows, fields: list[str]) -> dict:
+    """One array per field instead of one object per row.
+
+    Fields in DICTIONARY_FIELDS hold indexes into `dictionaries[field]`
+    (null stays null), so a repeated string is sent once per response.
+    """
+    values = list(zip(*rows)) if rows else [()] * len(fields)
+    columns, dictionaries = {}, {}
+    for field, column in zip(fields, values):
+        if field in DICTIONARY_FIELDS:
+            index: dict = {}
+            column = [None if value is None else index.setdefault(value, len(index)) for value in column]
+            dictionaries[field] = list(index)
+        columns[field] = list(column)
+    return {"count": len(rows), "fields": fields, "columns": columns, "dictionaries": dictionaries}
+
+
+def _response(content, response: Response) -> Response:
+    # Carries over headers already set on the injected response, which FastAPI
+    # ignores when a handler returns its own Response
+    return Response(content=dumps(content), media_type="application/json", headers=dict(response.headers))
+
+
+def json_response(rows, response: Response, fields: list[str] = COMPANY_FIELDS) -> Response:
+    """Encode rows straight to bytes, skipping ORM hydration and per-row validation"""
+    return _response(rows_to_dicts(rows, fields), response)
+
+
+def columnar_response(rows, response: Response, fields: list[str]) -> Response:
+    return _response(to_columnar(rows, fields), response)
+
+
+def object_response(row, response: Response, fields: list[str]) -> Response:
+    return _response(dict(zip(fields, row)), response)
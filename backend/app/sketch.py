@@ -0,0 +1,101 @@
+"""Mergeable quantile sketch (DDSketch) for compensation distributions.
+
+Values are counted in logarithmic bins whose width guarantees every quantile
+is returned within `relative_accuracy` of the true value. Bins are plain
+counters, so sketches merge by adding counts and a deleted row is removed by
+decrementing its bin; the size depends on the value range, not the row count.
+"""
+import math
+from bisect import bisect_right
+from collections import Counter
+from typing import Iterable
+
+
+DEFAULT_ACCURACY = 0.01
+
+# Values at or below this are counted in the zero bin (log() is undefined there)
+MIN_POSITIVE = 1e-9
+
+
+class DDSketch:
+    def __init__(self, relative_accuracy: float = DEFAULT_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Counter = Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        # Midpoint of the bin (gamma^(i-1), gamma^i] in relative terms
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """Add `count` occurrences of value; a negative count removes them"""
+        if value <= MIN_POSITIVE:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            self.bins[index] += count
+            if self.bins[index] <= 0:
+                del self.bins[index]
+        self.count += count
+
+    def remove(self, value: float, count: int = 1):
+        self.add(value, -count)
+
+    def merge(self, other: "DDSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.bins.update(other.bins)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def copy(self) -> "DDSketch":
+        sketch = DDSketch(self.relative_accuracy)
+        sketch.merge(self)
+        return sketch
+
+    def _walk(self):
+        """(representative value, count) pairs in ascending order"""
+        if self.zero_count > 0:
+            yield 0.0, self.zero_count
+        for index in sorted(self.bins):
+            yield self._value(index), self.bins[index]
+
+    def quantile(self, q: float) -> float | None:
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, count in self._walk():
+            seen += count
+            if seen > rank:
+                return value
+        return None
+
+    def histogram(self, edges: list[float]) -> list[dict]:
+        """Counts per [edges[i], edges[i + 1]) bucket; the last bucket is open-ended.
+
+        Bins are placed by their representative value, so a value within
+        relative_accuracy of an edge may be counted on either side of it.
+        """
+        counts = [0] * len(edges)
+        for value, count in self._walk():
+            # Values below the first edge land in the first bucket
+            bucket = max(bisect_right(edges, value) - 1, 0)
+            counts[bucket] += count
+        return [
+            {"min": lo, "max": hi, "count": n}
+            for lo, hi, n in zip(edges, list(edges[1:]) + [None], counts)
+        ]
+
+
+def merged(sketches: Iterable[DDSketch], relative_accuracy: float = DEFAULT_ACCURACY) -> DDSketch:
+    total = DDSketch(relative_accuracy)
+    for sketch in sketches:
+        total.merge(sketch)
+    return total
@@ -0,0 +1,203 @@
+"""Static snapshot bundle for serving reads from a CDN or GitHub Pages.
+
+    SNAPSHOT_DIR/
+        manifest.json               latest version and its files; revalidate on every load
+        v<epoch>-<version>/companies.json   every company, as GET /api/companies returns them
+        v<epoch>-<version>/stats.json       as GET /api/stats returns it
+
+Every file has .gz and (with the optional brotli package) .br siblings for
+hosts that serve precompressed files. Versions are named after the shared
+data version, which every write increments and nothing ever lowers, and the
+database's random epoch, so a recreated database never reuses a name. Their
+files never change and can be cached forever; the manifest is replaced last
+and atomically, so a reader never sees a manifest pointing at a half-written
+version.
+
+Rebuilt in the background after writes (when SNAPSHOT_DIR is set), on
+demand with POST /api/snapshot, or from the command line:
+
+    cd backend
+    python -m app.snapshot --out ../frontend/public/snapshot
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.changes import EPOCH_KEY, VERSION_KEY
+from app.models import AppMeta, Company
+from app.serialization import COMPANY_COLUMNS, dumps, rows_to_dicts
+from app.stats import stats_store
+
+try:
+    import brotli
+except ImportError:  # optional; only the .br files are skipped
+    brotli = None
+
+
+MANIFEST = "manifest.json"
+# v<epoch hex>-<version>; bare v<n> directories are from the old naming
+VERSION_DIR = re.compile(r"v(?:([0-9a-f]+)-)?(\d+)")
+# Quality 11 takes seconds per megabyte; 9 is within a few percent of it
+BROTLI_QUALITY = 9
+
+# One build at a time, whether triggered by a write, the endpoint or the CLI
+_build_lock = threading.Lock()
+
+
+def _encodings(body: bytes) -> dict[str, bytes]:
+    # mtime=0 keeps the .gz bytes identical for identical content
+    encoded = {"": body, ".gz": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded[".br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return encoded
+
+
+def _write_file(directory: Path, name: str, body: bytes) -> dict:
+    """name plus its compressed siblings; each replaced atomically"""
+    sizes = {}
+    for suffix, data in _encodings(body).items():
+        tmp = directory / f".{name}{suffix}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, directory / f"{name}{suffix}")
+        sizes[suffix.lstrip(".") or "identity"] = len(data)
+    return {"bytes": sizes, "sha256": hashlib.sha256(body).hexdigest()}
+
+
+def _prune(out: Path, keep: int, current: str, epoch: str):
+    versions = []
+    for path in out.iterdir():
+        match = VERSION_DIR.fullmatch(path.name)
+        if path.is_dir() and match:
+            # Other epochs and the old naming sort first, so they go first
+            versions.append(((match.group(1) == epoch, int(match.group(2))), path))
+    versions = [path for _, path in sorted(versions)]
+    for path in versions[:-keep] if keep > 0 else versions:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def write_snapshot(db: Session, out_dir: str, keep: int | None = None) -> dict:
+    """Render companies and stats into out_dir and point the manifest at them"""
+    keep = settings.SNAPSHOT_KEEP if keep is None else keep
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    with _build_lock:
+        # Writers commit under the stats lock: the version and stats match
+        with stats_store.lock:
+            meta = dict(db.execute(select(AppMeta.key, AppMeta.value).where(AppMeta.key.in_((VERSION_KEY, EPOCH_KEY)))).all())
+            stats = stats_store.snapshot(db)
+        version, epoch = meta.get(VERSION_KEY, 0), f"{meta.get(EPOCH_KEY, 0):x}"
+        # A write landing after this point bumps the version and schedules another build
+        rows = db.execute(select(*COMPANY_COLUMNS).order_by(Company.id)).all()
+
+        name = f"v{epoch}-{version}"
+        final = out / name
+        files = {}
+        staging = Path(tempfile.mkdtemp(prefix=f".{name}-", dir=out))
+        try:
+            # mkdtemp is owner-only; the web server serving the bundle needs to read it
+            staging.chmod(0o755)
+            files["companies"] = {"path": f"{name}/companies.json", **_write_file(staging, "companies.json", dumps(rows_to_dicts(rows)))}
+            files["stats"] = {"path": f"{name}/stats.json", **_write_file(staging, "stats.json", dumps(stats))}
+            if final.exists():
+                # Same version, same data: leave the published files alone
+                shutil.rmtree(staging)
+            else:
+                try:
+                    os.replace(staging, final)
+                except OSError:
+                    # Another worker published this version first
+                    if not final.exists():
+                        raise
+                    shutil.rmtree(staging)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        manifest = {
+            "version": version,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "companies": len(rows),
+            "encodings": ["gzip", "br"] if brotli is not None else ["gzip"],
+            "files": files,
+        }
+        _write_file(out, MANIFEST, dumps(manifest))
+        _prune(out, keep, name, epoch)
+    return manifest
+
+
+class SnapshotWriter:
+    """Rebuilds the snapshot in a background thread after writes.
+
+    Writes arriving while a build is pending or running coalesce into one
+    more build, so a burst of edits costs at most two.
+    """
+
+    def __init__(self, session_factory, out_dir: str, delay: float):
+        self.session_factory = session_factory
+        self.out_dir = out_dir
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending = False
+        self._thread: threading.Thread | None = None
+
+    def request(self):
+        with self._lock:
+            self._pending = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            # Let a burst of writes settle before rendering
+            time.sleep(self.delay)
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                self._pending = False
+            db = self.session_factory()
+            try:
+                write_snapshot(db, self.out_dir)
+            except Exception as e:
+                print(f"Warning: could not write snapshot: {e}")
+            finally:
+                db.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Write the static companies/stats snapshot bundle")
+    parser.add_argument("--out", default=settings.SNAPSHOT_DIR, help="output directory (default: SNAPSHOT_DIR)")
+    parser.add_argument("--keep", type=int, default=settings.SNAPSHOT_KEEP, help="versions to keep")
+    args = parser.parse_args(argv)
+    if not args.out:
+        parser.error("give --out or set SNAPSHOT_DIR")
+
+    from app.database import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        manifest = write_snapshot(db, args.out, args.keep)
+    finally:
+        db.close()
+    print(f"Wrote snapshot version {manifest['version']} ({manifest['companies']} companies) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
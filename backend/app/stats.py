@@ -0,0 +1,372 @@
+import math
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from statistics import median
+from datetime import date
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Company
+from app.sketch import DEFAULT_ACCURACY, DDSketch, merged
+
+
+EMPTY_STATS = {
+    "total_unique_companies": 0,
+    "on_campus": 0,
+    "ppo": 0,
+    "average_stipend": 0,
+    "average_ctc": 0,
+    "median_ctc": 0,
+    "average_ctc_weighted": 0,
+    "students_selected": 0,
+    "intern_count": 0,
+    "fte_count": 0,
+    "intern_fte_count": 0,
+}
+
+# /api/stats/distribution: sketched amounts, reported percentiles and histogram edges (INR)
+DISTRIBUTION_METRICS = ("ctc", "fixed", "stipend")
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+HISTOGRAM_EDGES = {
+    "ctc": [0, 500000, 1000000, 1500000, 2000000, 3000000, 5000000],
+    "fixed": [0, 500000, 1000000, 1500000, 2000000, 3000000, 5000000],
+    "stipend": [0, 10000, 20000, 30000, 50000, 75000, 100000],
+}
+
+
+class StatsRow(NamedTuple):
+    """The subset of a Company row that feeds the dashboard stats"""
+    company_name: str
+    offer_category: str
+    is_ppo: bool
+    students_selected: int
+    ctc_amount: float | None
+    stipend_amount: float | None
+    fixed_amount: float | None
+    notification_date: date
+    season: str
+
+
+STATS_COLUMNS = (
+    Company.company_name,
+    Company.offer_category,
+    Company.is_ppo,
+    Company.students_selected,
+    Company.ctc_amount,
+    Company.stipend_amount,
+    Company.fixed_amount,
+    Company.notification_date,
+    Company.season,
+)
+
+
+def stats_row(company) -> StatsRow:
+    return StatsRow(*(getattr(company, col.key) for col in STATS_COLUMNS))
+
+
+def stats_row_from_values(values: dict) -> StatsRow:
+    return StatsRow(*(values[col.key] for col in STATS_COLUMNS))
+
+
+def stats_select(season: str | None = None):
+    """STATS_COLUMNS of one season's rows (served by the season-led indexes), or of all rows"""
+    stmt = select(*STATS_COLUMNS)
+    if season is not None:
+        stmt = stmt.where(Company.season == season)
+    return stmt
+
+
+def load_rows(db: Session, season: str | None = None) -> list[StatsRow]:
+    return [StatsRow(*row) for row in db.execute(stats_select(season)).all()]
+
+
+def compute_stats(rows: list[StatsRow]) -> dict:
+    """Full recompute of the dashboard stats from scratch"""
+    if not rows:
+        return dict(EMPTY_STATS)
+
+    # Unique companies and PPO
+    total_unique = len(set(r.company_name for r in rows))
+    ppo_count = len(set(r.company_name for r in rows if r.is_ppo))
+
+    # Stipend: explicit only; CTC: explicit amounts; Fixed: explicit or "same as CTC"
+    stipend_weighted = [(r.stipend_amount, r.students_selected) for r in rows if r.stipend_amount is not None]
+    ctc_simple = [r.ctc_amount for r in rows if r.ctc_amount is not None]
+    fixed_weighted = [(r.fixed_amount, r.students_selected) for r in rows if r.fixed_amount is not None]
+
+    def weighted_avg(pairs: list[tuple[float, int]]) -> float:
+        if not pairs:
+            return 0.0
+        total_value = sum(v * w for v, w in pairs)
+        total_weight = sum(w for _, w in pairs)
+        return (total_value / total_weight) if total_weight > 0 else 0.0
+
+    # Count students by type
+    by_kind = Counter()
+    for r in rows:
+        by_kind[r.offer_category] += r.students_selected
+
+    # Median package secured: use Fixed values median when available
+    fixed_values_only = [v for v, _ in fixed_weighted]
+
+    return {
+        "total_unique_companies": total_unique,
+        "on_campus": total_unique - ppo_count,
+        "ppo": ppo_count,
+        # Weighted average stipend across entries that explicitly report stipend
+        "average_stipend": weighted_avg(stipend_weighted),
+        # Average CTC as simple mean of explicit CTC amounts
+        "average_ctc": (sum(ctc_simple) / len(ctc_simple)) if ctc_simple else 0.0,
+        # Median package secured: based on Fixed values
+        "median_ctc": median(fixed_values_only) if fixed_values_only else 0.0,
+        # Average package secured (weighted): use Fixed values
+        "average_ctc_weighted": weighted_avg(fixed_weighted),
+        "students_selected": sum(r.students_selected for r in rows),
+        "intern_count": by_kind["intern"],
+        "fte_count": by_kind["fte"],
+        "intern_fte_count": by_kind["intern_fte"],
+    }
+
+
+class StatsPartition:
+    """Running sums behind the stats of one season, or of every season"""
+
+    def __init__(self):
+        self.rows = 0
+        self.companies: Counter = Counter()
+        self.ppo_companies: Counter = Counter()
+        self.stipend_sum = 0.0
+        self.stipend_weight = 0
+        self.ctc_sum = 0.0
+        self.ctc_count = 0
+        self.fixed_sum = 0.0
+        self.fixed_weight = 0
+        self.fixed_sorted: list[float] = []
+        self.students = 0
+        self.by_kind: Counter = Counter()
+        # (metric, year) -> sketch of that year's amounts; merged on read
+        self.sketches: dict[tuple[str, int], DDSketch] = {}
+
+    def add(self, row: StatsRow, sign: int):
+        w = row.students_selected
+        self.rows += sign
+        self.companies[row.company_name] += sign
+        if self.companies[row.company_name] <= 0:
+            del self.companies[row.company_name]
+        if row.is_ppo:
+            self.ppo_companies[row.company_name] += sign
+            if self.ppo_companies[row.company_name] <= 0:
+                del self.ppo_companies[row.company_name]
+        if row.stipend_amount is not None:
+            self.stipend_sum += sign * row.stipend_amount * w
+            self.stipend_weight += sign * w
+        if row.ctc_amount is not None:
+            self.ctc_sum += sign * row.ctc_amount
+            self.ctc_count += sign
+        if row.fixed_amount is not None:
+            self.fixed_sum += sign * row.fixed_amount * w
+            self.fixed_weight += sign * w
+            if sign > 0:
+                insort(self.fixed_sorted, row.fixed_amount)
+            else:
+                i = bisect_left(self.fixed_sorted, row.fixed_amount)
+                if i < len(self.fixed_sorted) and self.fixed_sorted[i] == row.fixed_amount:
+                    del self.fixed_sorted[i]
+        self.students += sign * w
+        self.by_kind[row.offer_category] += sign * w
+        year = row.notification_date.year
+        for metric, value in zip(DISTRIBUTION_METRICS, (row.ctc_amount, row.fixed_amount, row.stipend_amount)):
+            if value is not None:
+                if (metric, year) not in self.sketches:
+                    self.sketches[(metric, year)] = DDSketch()
+                self.sketches[(metric, year)].add(value, sign)
+
+    def result(self) -> dict:
+        if self.rows == 0:
+            return dict(EMPTY_STATS)
+        total_unique = len(self.companies)
+        ppo_count = len(self.ppo_companies)
+        fixed = self.fixed_sorted
+        n = len(fixed)
+        if n == 0:
+            median_fixed = 0.0
+        elif n % 2:
+            median_fixed = fixed[n // 2]
+        else:
+            median_fixed = (fixed[n // 2 - 1] + fixed[n // 2]) / 2
+        return {
+            "total_unique_companies": total_unique,
+            "on_campus": total_unique - ppo_count,
+            "ppo": ppo_count,
+            "average_stipend": (self.stipend_sum / self.stipend_weight) if self.stipend_weight > 0 else 0.0,
+            "average_ctc": (self.ctc_sum / self.ctc_count) if self.ctc_count else 0.0,
+            "median_ctc": median_fixed,
+            "average_ctc_weighted": (self.fixed_sum / self.fixed_weight) if self.fixed_weight > 0 else 0.0,
+            "students_selected": self.students,
+            "intern_count": self.by_kind["intern"],
+            "fte_count": self.by_kind["fte"],
+            "intern_fte_count": self.by_kind["intern_fte"],
+        }
+
+
+class StatsStore:
+    """Materialized dashboard stats maintained by deltas on every write.
+
+    Sums, counts and per-company reference counts are adjusted as rows are
+    added or removed, and Fixed values are kept in a sorted list for the
+    median, so reading the stats never touches the companies table once the
+    store has been loaded.
+
+    There is one partition per requested season that has rows, plus one (key
+    None) for all seasons. Each is loaded on first use from that season's rows
+    only, and its result is cached until a write touches the season, so closed
+    seasons are computed once however much history the table holds.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # Bumped on every commit/invalidate so loads racing a write can be discarded
+        self.generation = 0
+        self._partitions: dict[str | None, StatsPartition] = {}
+        self._results: dict[str | None, dict] = {}
+
+    def load(self, db: Session, season: str | None = None):
+        with self.lock:
+            self.load_from(load_rows(db, season), self.generation, season)
+
+    def load_from(
+        self, rows: Iterable[StatsRow], generation: int, season: str | None = None, blocking: bool = True
+    ) -> bool:
+        """Materialize a partition from rows read while the store was at `generation`.
+
+        Returns False (and leaves it unloaded) if a write committed since, as
+        the rows may predate it, or if blocking is False and the lock is busy;
+        used by readers that cannot hold the lock while they query.
+        """
+        if not self.lock.acquire(blocking=blocking):
+            return False
+        try:
+            if generation != self.generation:
+                return False
+            partition = StatsPartition()
+            for row in rows:
+                partition.add(row, 1)
+            # Seasons nobody has written to are not kept, so requests for
+            # arbitrary seasons cannot grow the store; they reload when asked
+            if partition.rows or season is None:
+                self._partitions[season] = partition
+            self._results.pop(season, None)
+            return True
+        finally:
+            self.lock.release()
+
+    def invalidate(self, seasons: Iterable[str] | None = None):
+        """Drop the materialized state of some seasons (and of all seasons), or of every partition"""
+        with self.lock:
+            self.generation += 1
+            if seasons is None:
+                self._partitions.clear()
+                self._results.clear()
+                return
+            for key in (None, *seasons):
+                self._partitions.pop(key, None)
+                self._results.pop(key, None)
+
+    def apply(self, removed: Iterable[StatsRow] = (), added: Iterable[StatsRow] = ()):
+        """Adjust every loaded partition the rows belong to"""
+        with self.lock:
+            for sign, rows in ((-1, removed), (1, added)):
+                for row in rows:
+                    for key in (None, row.season):
+                        partition = self._partitions.get(key)
+                        if partition is not None:
+                            partition.add(row, sign)
+                            self._results.pop(key, None)
+
+    def commit(self, db: Session, removed: Iterable[StatsRow] = (), added: Iterable[StatsRow] = ()):
+        """Commit the session and apply the matching deltas atomically.
+
+        The lock is held across the commit so a concurrent load can never
+        observe the new rows and then have the same delta applied on top.
+        """
+        with self.lock:
+            db.commit()
+            self.generation += 1
+            self.apply(removed, added)
+
+    def _partition(self, db: Session, season: str | None) -> StatsPartition:
+        with self.lock:
+            if season not in self._partitions:
+                self.load(db, season)
+            return self._partitions.get(season) or StatsPartition()
+
+    def snapshot(self, db: Session, season: str | None = None) -> dict:
+        with self.lock:
+            partition = self._partition(db, season)
+            return self.cached(season) or partition.result()
+
+    def cached(self, season: str | None = None, blocking: bool = True) -> dict | None:
+        """The materialized stats of a season (all when None), or None while not loaded.
+
+        With blocking=False it is also None while a write or load holds the lock,
+        so the event loop never waits on one.
+        """
+        if not self.lock.acquire(blocking=blocking):
+            return None
+        try:
+            partition = self._partitions.get(season)
+            if partition is None:
+                return None
+            if season not in self._results:
+                self._results[season] = partition.result()
+            return dict(self._results[season])
+        finally:
+            self.lock.release()
+
+    def distribution(self, db: Session, year: int | None = None, season: str | None = None) -> dict:
+        """Percentiles and histograms per amount, for one year or all of them merged"""
+        with self.lock:
+            sketches = self._partition(db, season).sketches
+            live = {key: sketch for key, sketch in sketches.items() if sketch.count > 0}
+            metrics = {}
+            for metric in DISTRIBUTION_METRICS:
+                sketch = merged(s for (m, y), s in live.items() if m == metric and (year is None or y == year))
+                metrics[metric] = {
+                    "count": sketch.count,
+                    "percentiles": {f"p{p}": sketch.quantile(p / 100) for p in PERCENTILES},
+                    "histogram": sketch.histogram(HISTOGRAM_EDGES[metric]),
+                }
+            return {
+                "year": year,
+                "season": season,
+                "years": sorted({y for _, y in live}),
+                "relative_accuracy": DEFAULT_ACCURACY,
+                "metrics": metrics,
+            }
+
+    def check(self, db: Session, season: str | None = None) -> dict:
+        """Compare the incremental stats against a full recompute"""
+        with self.lock:
+            incremental = self.snapshot(db, season)
+            recomputed = compute_stats(load_rows(db, season))
+        return consistency_report(incremental, recomputed)
+
+
+def consistency_report(incremental: dict, recomputed: dict) -> dict:
+    mismatches = [
+        key
+        for key in recomputed
+        if not math.isclose(incremental[key], recomputed[key], rel_tol=1e-9, abs_tol=1e-6)
+    ]
+    return {
+        "consistent": not mismatches,
+        "mismatches": mismatches,
+        "incremental": incremental,
+        "recomputed": recomputed,
+    }
+
+
+stats_store = StatsStore()
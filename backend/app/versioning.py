@@ -0,0 +1,136 @@
+import math
+import secrets
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, NamedTuple
+
+from fastapi import Request, Response
+
+
+class Version(NamedTuple):
+    number: int
+    etag: str
+    last_modified: float
+
+    def headers(self) -> dict:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            # Let browsers keep the body but revalidate it on every load
+            "Cache-Control": "no-cache",
+        }
+
+    def matches(self, request: Request) -> bool:
+        """True when the client's cached copy is still current"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            # Weak comparison is allowed for If-None-Match
+            return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= self.last_modified
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class DataVersion:
+    """Monotonic version of the companies table, bumped after every committed write.
+
+    With several workers, each request first adopts the shared version row
+    (see app.coherence); ETags then name that row, so every worker issues the
+    same tag for the same data. Until then (or with SHARED_VERSION_CHECK off)
+    the ETag carries a per-process boot id so a restart can never reissue a
+    tag that a client cached against different data.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boot = secrets.token_hex(4)
+        self._number = 0
+        self._last_modified = float(math.ceil(time.time()))
+        self._listeners: list[Callable[[], None]] = []
+        self._change_listeners: list[Callable[[], None]] = []
+        # Shared version (and database epoch) the local caches reflect; None until first observed
+        self._shared: int | None = None
+        self._epoch = 0
+
+    def on_bump(self, listener: Callable[[], None]):
+        """Call listener after every bump (from the writing thread; keep it quick)"""
+        self._listeners.append(listener)
+
+    def on_change(self, listener: Callable[[], None]):
+        """Call listener when another process changed the data (local caches are stale)"""
+        self._change_listeners.append(listener)
+
+    def current(self) -> Version:
+        with self._lock:
+            if self._shared is not None:
+                etag = f'"{self._epoch:x}-{self._shared}"'
+            else:
+                etag = f'"{self._boot}-{self._number}"'
+            return Version(self._number, etag, self._last_modified)
+
+    def _advance(self):
+        # Callers hold the lock
+        self._number += 1
+        # HTTP dates have one-second resolution; keep each version on its own second
+        self._last_modified = max(float(math.ceil(time.time())), self._last_modified + 1)
+
+    def bump(self):
+        with self._lock:
+            self._advance()
+        for listener in self._listeners:
+            listener()
+
+    def committed(self, shared: int):
+        """Note a shared version this process just wrote.
+
+        Its caches already hold that write, so it is adopted without
+        invalidating, but only when it directly follows the last version seen;
+        otherwise another process wrote in between and the next observe()
+        drops the caches.
+        """
+        with self._lock:
+            if self._shared is not None and shared == self._shared + 1:
+                self._shared = shared
+
+    def adopted(self, shared: int, epoch: int) -> bool:
+        """True when the local caches already reflect this shared version"""
+        with self._lock:
+            return shared == self._shared and epoch == self._epoch
+
+    def observe(self, shared: int, epoch: int) -> bool:
+        """Adopt the shared version read at the start of a request.
+
+        Returns True, after advancing and calling the on_change listeners, when
+        it moved without this process writing it.
+        """
+        with self._lock:
+            if shared == self._shared and epoch == self._epoch:
+                return False
+            self._shared, self._epoch = shared, epoch
+            self._advance()
+        for listener in self._change_listeners:
+            listener()
+        return True
+
+
+data_version = DataVersion()
+
+
+def conditional_get(request: Request, response: Response) -> Response | None:
+    """Stamp validators on the response; return a 304 when the client is current.
+
+    Call before querying: the version is read first, so a write landing mid-request
+    can only make the tag older than the body, never newer.
+    """
+    version = data_version.current()
+    headers = version.headers()
+    if version.matches(request):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
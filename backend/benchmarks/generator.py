@@ -0,0 +1,155 @@
+"""Synthetic company records shaped like the real placement data.
+
+Rows follow the distributions and free-text formats seen in app.seed's
+sample_data: lakh-comma amounts with and without paise, "35k" stipends,
+"Fixed - same as CTC", multi-component packages (ESOPs, RSUs, bonuses),
+stipend-only internships and a mix of offer types and branch spellings.
+
+    cd backend
+    python -m benchmarks.generator --rows 10000 > companies.json
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import date, timedelta
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from app.importer import import_companies
+
+
+PREFIXES = [
+    "Apex", "Blue", "Cloud", "Data", "Eagle", "Fin", "Green", "Hyper", "Infra", "Jade", "Kite", "Lumen",
+    "Matrix", "Nova", "Orbit", "Pixel", "Quant", "River", "Sigma", "Titan", "Ultra", "Vertex", "Wave", "Zen",
+]
+SUFFIXES = ["Labs", "Technologies", "Systems", "Software", "Analytics", "Networks", "Solutions", "AI", "Robotics", "Capital"]
+ROLES = [
+    "SDE", "Software Engineer", "Associate Software Engineer", "Backend Developer", "Frontend Developer",
+    "Full Stack Developer", "Data Science", "Data Engineer", "Business Analyst", "ML Engineer", "SRE",
+    "Devops", "SDET", "Quality Assurance", "Cloud Engineer", "Product Engineer", "UI/UX", "Graduate Engineer Trainee",
+]
+BRANCHES = [
+    "CSE, ECE, CCE, Mech", "CSE, CCE, ECE", "CSE, CCE", "CSE", "CSE, ECE, CCE", "Mechanical", "N/A", "ECE",
+]
+CGPAS = ["5", "6", "6.5", "7", "7.5", "8", "N/A", "By Company - 5, after shortlisting - 7"]
+# (type_of_offer, weight); placement-season FTE offers dominate like the real data
+OFFERS = [
+    ("SLI + FTE", 60),
+    ("FTE", 8),
+    ("SLI", 8),
+    ("Summer Intern", 6),
+    ("Intern + PPO", 6),
+    ("SLI + Performance Based PPO", 6),
+    ("SLI + PPO based on Performance", 6),
+]
+EXTRAS = ["ESOPS", "ESOPs", "RSUs", "Variable Pay bonus", "Joining Bonus", "Other Variable", "Bonus"]
+
+
+def lakh(amount: int) -> str:
+    """Indian digit grouping: 1250000 -> '12,50,000'"""
+    text = str(amount)
+    if len(text) > 3:
+        head, tail = text[:-3], text[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        groups.insert(0, head)
+        text = ",".join(groups + [tail])
+    return text
+
+
+def _stipend(rng: random.Random) -> int:
+    return rng.choice([10000, 15000, 20000, 25000, 27500, 30000, 35000, 40000, 48200, 50000, 65000, 75000, 100000, 150000])
+
+
+def ctc_stipend_text(rng: random.Random, offer: str) -> str:
+    stipend = _stipend(rng)
+    if offer in ("SLI", "Summer Intern") or ("PPO" in offer and rng.random() < 0.3):
+        # Internship only: stipend, sometimes in shorthand
+        lines = [f"Stipend: ₹{lakh(stipend)}"]
+        if rng.random() < 0.2:
+            lines.append(f"Stipend - {stipend // 1000}k fixed")
+        if offer == "Summer Intern" and rng.random() < 0.3:
+            lines.append("PPO Converted")
+        return "\n".join(lines)
+
+    # Log-normal CTC around 12 LPA with a long right tail, rounded like real offers
+    ctc = int(round(min(max(rng.lognormvariate(14.0, 0.45), 400000), 6000000), -4))
+    if rng.random() < 0.05:
+        # Just-under-a-round-number packages: "12,49,999.99"
+        lines = [f"CTC: ₹{lakh(ctc - 1)}.{rng.choice(['99', '95'])}"]
+    else:
+        lines = [f"CTC: ₹{lakh(ctc)}"]
+    if offer != "FTE" and rng.random() < 0.85:
+        lines.append(f"Stipend: ₹{lakh(stipend)}")
+    roll = rng.random()
+    if roll < 0.1:
+        lines.append("Fixed - same as CTC")
+    elif roll < 0.75:
+        fixed = round(ctc * rng.uniform(0.6, 1.0), -4)
+        fixed_line = f"Fixed - {int(fixed)}"
+        remainder = ctc - fixed
+        # Multi-component packages spell out what makes up the rest
+        while remainder > 50000 and rng.random() < 0.6:
+            part = round(remainder * rng.uniform(0.3, 1.0), -4)
+            fixed_line += f" {rng.choice(EXTRAS)} - {int(part)}"
+            remainder -= part
+        if rng.random() < 0.1:
+            fixed_line += " (Remote)"
+        lines.append(fixed_line)
+    return "\n".join(lines)
+
+
+def generate_companies(
+    count: int, seed: int = 0, start: date = date(2018, 7, 1), end: date = date(2026, 6, 30)
+) -> Iterator[dict]:
+    """`count` CompanyCreate-shaped records; the same count and seed always yield the same rows"""
+    rng = random.Random(seed)
+    # Several drives per company, like repeat recruiters across seasons
+    names = [f"{rng.choice(PREFIXES)}{rng.choice(SUFFIXES)} {i}" for i in range(max(count // 3, 1))]
+    offers, weights = zip(*OFFERS)
+    span = (end - start).days
+    for _ in range(count):
+        offer = rng.choices(offers, weights)[0]
+        yield {
+            "notification_date": (start + timedelta(days=rng.randrange(span))).isoformat(),
+            "company_name": rng.choice(names),
+            "type_of_offer": offer,
+            "branches_allowed": rng.choice(BRANCHES),
+            "eligibility_cgpa": rng.choice(CGPAS),
+            "job_roles": ", ".join(rng.sample(ROLES, rng.randint(1, 3))),
+            "ctc_stipend": ctc_stipend_text(rng, offer),
+            "students_selected": rng.choice([0, 1, 1, 2, 2, 3, 4, 5, 7, 10, 21]),
+            "process": "Pending" if rng.random() < 0.1 else "Completed",
+        }
+
+
+def load_dataset(db: Session, count: int, seed: int = 0, chunk_size: int = 50000):
+    """Replace the companies table with `count` generated rows, through the real importer"""
+    records = generate_companies(count, seed)
+    first = True
+    while True:
+        chunk = [record for _, record in zip(range(chunk_size), records)]
+        if not chunk and not first:
+            break
+        report = import_companies(db, chunk, replace=first, strict=True)
+        if report["errors"]:
+            raise ValueError(f"Generated invalid rows: {report['errors'][:3]}")
+        first = False
+        if len(chunk) < chunk_size:
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print generated company records as a JSON array")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    json.dump(list(generate_companies(args.rows, args.seed)), sys.stdout, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
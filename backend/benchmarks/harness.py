@@ -0,0 +1,252 @@
+"""Load benchmark for the API, driven in-process over ASGI (no network, no server).
+
+For each dataset size the companies table is filled with generated rows
+(benchmarks.generator) through the real importer, then every scenario is run
+with a fixed number of requests at the given concurrency. Reports latency
+percentiles, throughput and peak Python memory (tracemalloc, measured in a
+separate shorter pass so tracing does not skew the timings).
+
+    cd backend
+    python -m benchmarks.harness --rows 1000 10000 --requests 200 --concurrency 8
+    python -m benchmarks.harness --rows 100000 --only list_page stats --compare benchmarks/results/<earlier>.json
+
+Results are written as JSON to benchmarks/results/ (or --out).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+# Point the app at a scratch database before app.database is imported
+_tmpdir = tempfile.mkdtemp(prefix="placement-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+ADMIN_TOKEN = os.environ.setdefault("ADMIN_TOKEN", "bench-admin-token")
+
+import httpx
+from sqlalchemy import func, select
+
+from app.database import SessionLocal, init_db
+from app.main import app
+from app.models import Company, CompanyChange
+from app.parsing import current_season
+from app.serialization import orjson
+from benchmarks.generator import ROLES, generate_companies, load_dataset
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+ADMIN = {"X-Admin-Token": ADMIN_TOKEN}
+# Relative slowdown (p50 or p99) reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.2
+
+
+class Dataset(NamedTuple):
+    rows: int
+    min_id: int
+    max_id: int
+    max_seq: int
+
+
+class Scenario(NamedTuple):
+    name: str
+    # (rng, dataset) -> (method, url, json body or None)
+    request: Callable[[random.Random, Dataset], tuple[str, str, dict | None]]
+
+
+def _new_company(rng: random.Random, data: Dataset):
+    record = next(generate_companies(1, seed=rng.randrange(1 << 30)))
+    return "POST", "/api/companies", record
+
+
+SCENARIOS = [
+    Scenario("list_page", lambda rng, d: ("GET", f"/api/companies?page={rng.randint(1, max(d.rows // 50, 1))}&page_size=50", None)),
+    Scenario("list_filtered", lambda rng, d: ("GET", "/api/companies?min_ctc=1000000&sort=ctc&order=desc&page_size=50", None)),
+    Scenario("list_1000", lambda rng, d: ("GET", "/api/companies?limit=1000", None)),
+    Scenario("list_1000_fields", lambda rng, d: ("GET", "/api/companies?limit=1000&fields=company_name,notification_date,ctc_amount", None)),
+    Scenario("list_1000_columnar", lambda rng, d: ("GET", "/api/companies?limit=1000&format=columnar", None)),
+    Scenario("company_detail", lambda rng, d: ("GET", f"/api/companies/{rng.randint(d.min_id, d.max_id)}", None)),
+    Scenario("stats", lambda rng, d: ("GET", "/api/stats", None)),
+    Scenario("stats_season", lambda rng, d: ("GET", f"/api/stats?season={current_season()}", None)),
+    Scenario("stats_grouped", lambda rng, d: ("GET", f"/api/stats/grouped?by={rng.choice(['month', 'offer_category', 'branch'])}", None)),
+    Scenario("stats_distribution", lambda rng, d: ("GET", "/api/stats/distribution", None)),
+    Scenario("search", lambda rng, d: ("GET", f"/api/search?q={rng.choice(ROLES)[:4]}", None)),
+    Scenario("changes", lambda rng, d: ("GET", f"/api/companies/changes?since={max(d.max_seq - 100, 0)}", None)),
+    Scenario("create", _new_company),
+    Scenario("update", lambda rng, d: ("PUT", f"/api/companies/{rng.randint(d.min_id, d.max_id)}", {"students_selected": rng.randint(0, 20)})),
+]
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear interpolation between closest ranks"""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+async def _send(client: httpx.AsyncClient, scenario: Scenario, rng: random.Random, data: Dataset) -> tuple[float, bool]:
+    method, url, body = scenario.request(rng, data)
+    start = time.perf_counter()
+    response = await client.request(method, url, json=body, headers=ADMIN if method != "GET" else None)
+    return time.perf_counter() - start, response.status_code < 400
+
+
+def dataset() -> Dataset:
+    db = SessionLocal()
+    try:
+        rows, min_id, max_id = db.execute(select(func.count(), func.min(Company.id), func.max(Company.id))).one()
+        return Dataset(rows, min_id or 0, max_id or 0, db.scalar(select(func.max(CompanyChange.seq))) or 0)
+    finally:
+        db.close()
+
+
+async def run_scenario(client, scenario: Scenario, data: Dataset, requests: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    for _ in range(min(5, requests)):
+        await _send(client, scenario, rng, data)
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            elapsed, ok = await _send(client, scenario, rng, data)
+            latencies.append(elapsed)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    # Peak memory in its own pass: tracing makes every allocation slower
+    tracemalloc.start()
+    for _ in range(min(20, requests)):
+        await _send(client, scenario, rng, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "rows": data.rows,
+        "endpoint": scenario.name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "mean_ms": round(sum(ms) / len(ms), 3),
+        "p50_ms": round(percentile(ms, 0.50), 3),
+        "p90_ms": round(percentile(ms, 0.90), 3),
+        "p99_ms": round(percentile(ms, 0.99), 3),
+        "max_ms": round(ms[-1], 3),
+        "throughput_rps": round(requests / wall, 1),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(current: list[dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {(r["rows"], r["endpoint"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}")
+    print(f"{'rows':>8} {'endpoint':<20} {'p50':>9} {'p99':>9} {'rps':>9}")
+    for result in current:
+        before = baseline.get((result["rows"], result["endpoint"]))
+        if not before:
+            continue
+
+        def change(key):
+            return (result[key] - before[key]) / before[key] if before[key] else 0.0
+
+        slower = max(change("p50_ms"), change("p99_ms")) > REGRESSION_THRESHOLD
+        print(
+            f"{result['rows']:>8} {result['endpoint']:<20} {change('p50_ms'):>+8.0%} {change('p99_ms'):>+8.0%} "
+            f"{change('throughput_rps'):>+8.0%}{'  REGRESSION' if slower else ''}"
+        )
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    scenarios = [s for s in SCENARIOS if not args.only or s.name in args.only]
+    init_db()
+    results, load_seconds = [], {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for rows in args.rows:
+            db = SessionLocal()
+            try:
+                start = time.perf_counter()
+                load_dataset(db, rows, seed=args.seed)
+                load_seconds[str(rows)] = round(time.perf_counter() - start, 3)
+            finally:
+                db.close()
+            print(f"\n{rows} rows (loaded in {load_seconds[str(rows)]:.1f}s)")
+            print(f"{'endpoint':<20} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'rps':>9} {'peak KiB':>10} {'errors':>7}")
+            for scenario in scenarios:
+                result = await run_scenario(client, scenario, dataset(), args.requests, args.concurrency, args.seed)
+                # Report the requested size even after earlier scenarios created rows
+                result["rows"] = rows
+                results.append(result)
+                print(
+                    f"{scenario.name:<20} {result['p50_ms']:>9.2f} {result['p90_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                    f"{result['throughput_rps']:>9.1f} {result['peak_memory_kb']:>10.1f} {result['errors']:>7}"
+                )
+    return {
+        "meta": {
+            "started_at": args.started_at,
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "orjson": orjson is not None,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "load_seconds": load_seconds,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=[s.name for s in SCENARIOS], help="run only these endpoints")
+    parser.add_argument("--out", help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    args = parser.parse_args()
+    args.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    report = asyncio.run(run(args))
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{args.started_at.replace(':', '')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {out}")
+    if args.compare:
+        compare(report["results"], args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
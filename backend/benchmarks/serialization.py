@@ -0,0 +1,77 @@
+"""Compare the ORM + response_model list path with the plain-row fast path.
+
+    cd backend
+    python -m benchmarks.serialization --rows 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+# Point the app at a scratch database before app.database is imported
+_tmpdir = tempfile.mkdtemp(prefix="placement-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app.database import SessionLocal, init_db
+from app.models import Company
+from app.schemas import Company as CompanySchema
+from app.serialization import COMPANY_COLUMNS, dumps, rows_to_dicts
+from benchmarks.generator import load_dataset
+
+adapter = TypeAdapter(List[CompanySchema])
+
+
+def orm_path(db) -> bytes:
+    # What FastAPI does with response_model=List[CompanySchema] and ORM objects
+    companies = db.scalars(select(Company).order_by(Company.id)).all()
+    models = adapter.validate_python(companies, from_attributes=True)
+    content = jsonable_encoder(models)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(db) -> bytes:
+    rows = db.execute(select(*COMPANY_COLUMNS).order_by(Company.id)).all()
+    return dumps(rows_to_dicts(rows))
+
+
+def timed(fn, db, repeat: int) -> tuple[float, bytes]:
+    times = []
+    body = b""
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        body = fn(db)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"{'rows':>8} {'orm ms':>10} {'fast ms':>10} {'speedup':>8}")
+        for count in args.rows:
+            load_dataset(db, count)
+            orm_time, orm_body = timed(orm_path, db, args.repeat)
+            fast_time, fast_body = timed(fast_path, db, args.repeat)
+            assert orm_body == fast_body, "fast path is not byte-compatible"
+            print(f"{count:>8} {orm_time * 1000:>10.1f} {fast_time * 1000:>10.1f} {orm_time / fast_time:>7.1f}x")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
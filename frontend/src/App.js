@@ -1,9 +1,55 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import axios from "axios";
 import "./App.css";
 
 // Use env-provided API URL when available; default to same-origin '/api'
 const API_URL = process.env.REACT_APP_API_URL || "/api";
+const PAGE_SIZE = 50;
+// Static snapshot bundle (backend app.snapshot) that visitors read instead of
+// the API, so a sleeping backend is only woken by admins
+const SNAPSHOT_URL = process.env.REACT_APP_SNAPSHOT_URL;
+
+// The manifest is revalidated on every load; the versioned files it points
+// at never change, so the browser and CDN can cache them freely
+const loadSnapshot = async () => {
+  const manifest = await (
+    await fetch(`${SNAPSHOT_URL}/manifest.json`, { cache: "no-cache" })
+  ).json();
+  const [companies, stats] = await Promise.all(
+    ["companies", "stats"].map(async (key) =>
+      (await fetch(`${SNAPSHOT_URL}/${manifest.files[key].path}`)).json()
+    )
+  );
+  return { companies, stats };
+};
+
+// Parsed CTC as the server filters and sorts by it: explicit CTC, else Fixed
+const ctcValue = (c) => c.ctc_amount ?? c.fixed_amount ?? null;
+
+// The server's q / min_ctc / sort semantics, applied to the snapshot rows
+const queryCompanies = (rows, { q, minCtc, sortKey, order }) => {
+  let result = rows;
+  if (q) {
+    const needle = q.trim().toLowerCase();
+    result = result.filter((c) => c.company_name.toLowerCase().includes(needle));
+  }
+  if (minCtc != null) {
+    result = result.filter((c) => ctcValue(c) != null && ctcValue(c) >= minCtc);
+  }
+  const value = sortKey === "ctc" ? ctcValue : (c) => (sortKey ? c[sortKey] : c.id);
+  const sign = order === "desc" ? -1 : 1;
+  return [...result].sort((a, b) => {
+    const x = value(a);
+    const y = value(b);
+    // NULLs sort first ascending, like SQLite
+    if (x !== y) {
+      if (x == null) return -sign;
+      if (y == null) return sign;
+      return x < y ? -sign : sign;
+    }
+    return (a.id - b.id) * sign;
+  });
+};
 
 function App() {
   const [companies, setCompanies] = useState([]);
@@ -11,6 +57,9 @@ function App() {
   const [searchTerm, setSearchTerm] = useState("");
   const [sortConfig, setSortConfig] = useState({ key: null, direction: "asc" });
   const [ctcFilter, setCtcFilter] = useState("all");
+  const [debouncedSearch, setDebouncedSearch] = useState("");
+  const [page, setPage] = useState(1);
+  const [totalCount, setTotalCount] = useState(0);
   const [showModal, setShowModal] = useState(false);
   const [editingCompany, setEditingCompany] = useState(null);
   const [formData, setFormData] = useState({
@@ -55,21 +104,130 @@ function App() {
     }
   };
 
+  // Admins read (and write) through the API; everyone else reads the snapshot
+  const fromSnapshot = Boolean(SNAPSHOT_URL) && !adminValid;
+  const snapshotRef = useRef(null);
+  const readSnapshot = () => {
+    if (!snapshotRef.current) {
+      snapshotRef.current = loadSnapshot().catch((error) => {
+        snapshotRef.current = null;
+        throw error;
+      });
+    }
+    return snapshotRef.current;
+  };
+
   useEffect(() => {
-    fetchCompanies();
     fetchStats();
-  }, []);
+  }, [adminValid]);
+
+  // Wait for typing to pause before querying the server
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  useEffect(() => {
+    fetchCompanies();
+  }, [debouncedSearch, ctcFilter, sortConfig, page, adminValid]);
 
+  // Filtering, sorting and paging happen server-side (or on the snapshot rows)
   const fetchCompanies = async () => {
+    if (fromSnapshot) {
+      try {
+        const { companies: all } = await readSnapshot();
+        const rows = queryCompanies(all, {
+          q: debouncedSearch,
+          minCtc: ctcFilter !== "all" ? parseInt(ctcFilter) * 100000 : null,
+          sortKey: sortConfig.key === "ctc_stipend" ? "ctc" : sortConfig.key,
+          order: sortConfig.direction,
+        });
+        setCompanies(rows.slice((page - 1) * PAGE_SIZE, page * PAGE_SIZE));
+        setTotalCount(rows.length);
+      } catch (error) {
+        console.error("Error reading snapshot:", error);
+      }
+      return;
+    }
+    const params = { page, page_size: PAGE_SIZE };
+    if (debouncedSearch) params.q = debouncedSearch;
+    if (ctcFilter !== "all") params.min_ctc = parseInt(ctcFilter) * 100000; // Convert lakhs to actual value
+    if (sortConfig.key) {
+      // The CTC/Stipend column sorts by the parsed CTC amount
+      params.sort = sortConfig.key === "ctc_stipend" ? "ctc" : sortConfig.key;
+      params.order = sortConfig.direction;
+    }
     try {
-      const response = await axios.get(`${API_URL}/companies`);
+      const response = await axios.get(`${API_URL}/companies`, { params });
       setCompanies(response.data);
+      setTotalCount(parseInt(response.headers["x-total-count"]) || 0);
     } catch (error) {
       console.error("Error fetching companies:", error);
     }
   };
 
+  // The change feed outlives renders; always refetch with the current filters/page
+  const fetchCompaniesRef = useRef(fetchCompanies);
+  fetchCompaniesRef.current = fetchCompanies;
+  // Whether an edited row can leave the page or move on it: a search, CTC
+  // filter or sort on a column other than id is active
+  const filteredRef = useRef(false);
+  filteredRef.current =
+    Boolean(debouncedSearch) ||
+    ctcFilter !== "all" ||
+    Boolean(sortConfig.key && sortConfig.key !== "id");
+
+  useEffect(() => {
+    // Snapshot readers stay off the backend entirely
+    if (SNAPSHOT_URL) return undefined;
+    const source = new EventSource(`${API_URL}/events`);
+    let refetchTimer = null;
+    let connectedBefore = false;
+    // Inserts, deletes, bulk writes and edits under a filter or sort shift
+    // rows between pages: refresh only the visible page, once per burst of events
+    const refreshPage = () => {
+      clearTimeout(refetchTimer);
+      refetchTimer = setTimeout(() => fetchCompaniesRef.current(), 200);
+    };
+    source.onopen = () => {
+      if (connectedBefore) {
+        // Events may have been missed while disconnected
+        fetchStats();
+        refreshPage();
+      }
+      connectedBefore = true;
+    };
+    source.addEventListener("company", (e) => {
+      const event = JSON.parse(e.data);
+      setStats(event.stats);
+      if (event.op === "update" && !filteredRef.current) {
+        // Unfiltered, id-ordered page: the row keeps its place
+        setCompanies((prev) =>
+          prev.map((c) => (c.id === event.company.id ? event.company : c))
+        );
+      } else {
+        refreshPage();
+      }
+    });
+    source.addEventListener("companies", (e) => {
+      setStats(JSON.parse(e.data).stats);
+      refreshPage();
+    });
+    return () => {
+      clearTimeout(refetchTimer);
+      source.close();
+    };
+  }, []);
+
   const fetchStats = async () => {
+    if (fromSnapshot) {
+      try {
+        setStats((await readSnapshot()).stats);
+      } catch (error) {
+        console.error("Error reading snapshot:", error);
+      }
+      return;
+    }
     try {
       const response = await axios.get(`${API_URL}/stats`);
       setStats(response.data);
@@ -80,6 +238,7 @@ function App() {
 
   const handleSearch = (e) => {
     setSearchTerm(e.target.value);
+    setPage(1);
   };
 
   const handleSort = (key) => {
@@ -88,57 +247,10 @@ function App() {
       direction = "desc";
     }
     setSortConfig({ key, direction });
+    setPage(1);
   };
 
-  // Extract CTC value for filtering
-  const getCtcValue = (ctcText) => {
-    if (!ctcText) return 0;
-    // Look for "CTC: ₹X" or "Fixed - X"
-    const ctcMatch = ctcText.match(/CTC:\s*₹?[\d,]+/i);
-    if (ctcMatch) {
-      const numbers = ctcText.match(/₹?([\d,]+)/g);
-      if (numbers && numbers[0]) {
-        return parseFloat(numbers[0].replace(/[₹,]/g, "")) || 0;
-      }
-    }
-    const fixedMatch = ctcText.match(/Fixed\s*-\s*₹?([\d,]+)/i);
-    if (fixedMatch) {
-      return parseFloat(fixedMatch[1].replace(/,/g, "")) || 0;
-    }
-    return 0;
-  };
-
-  const filteredAndSortedCompanies = companies
-    .filter((company) => {
-      // Search filter
-      const matchesSearch = company.company_name
-        .toLowerCase()
-        .includes(searchTerm.toLowerCase());
-
-      // CTC filter
-      if (ctcFilter === "all") return matchesSearch;
-
-      const ctcValue = getCtcValue(company.ctc_stipend);
-      const threshold = parseInt(ctcFilter) * 100000; // Convert lakhs to actual value
-      return matchesSearch && ctcValue >= threshold;
-    })
-    .sort((a, b) => {
-      if (!sortConfig.key) return 0;
-
-      const aValue = a[sortConfig.key];
-      const bValue = b[sortConfig.key];
-
-      if (typeof aValue === "string") {
-        const comparison = aValue.localeCompare(bValue);
-        return sortConfig.direction === "asc" ? comparison : -comparison;
-      } else if (typeof aValue === "number") {
-        return sortConfig.direction === "asc"
-          ? aValue - bValue
-          : bValue - aValue;
-      }
-
-      return 0;
-    });
+  const totalPages = Math.max(1, Math.ceil(totalCount / PAGE_SIZE));
 
   const handleAddClick = () => {
     setEditingCompany(null);
@@ -190,6 +302,8 @@ function App() {
       }
 
       setShowModal(false);
+      // Refetch even with the change feed connected: its event may come from
+      // another worker's stream, a second or more later
       fetchCompanies();
       fetchStats();
     } catch (error) {
@@ -336,7 +450,10 @@ function App() {
             />
             <select
               value={ctcFilter}
-              onChange={(e) => setCtcFilter(e.target.value)}
+              onChange={(e) => {
+                setCtcFilter(e.target.value);
+                setPage(1);
+              }}
               style={{
                 padding: "12px 20px",
                 fontSize: "1rem",
@@ -394,9 +511,9 @@ function App() {
                 </tr>
               </thead>
               <tbody>
-                {filteredAndSortedCompanies.map((company, index) => (
+                {companies.map((company, index) => (
                   <tr key={company.id}>
-                    <td>{index + 1}</td>
+                    <td>{(page - 1) * PAGE_SIZE + index + 1}</td>
                     <td>
                       {new Date(company.notification_date).toLocaleDateString(
                         "en-GB"
@@ -444,6 +561,37 @@ function App() {
               </tbody>
             </table>
           </div>
+
+          {totalPages > 1 && (
+            <div
+              className="pagination"
+              style={{
+                display: "flex",
+                justifyContent: "center",
+                alignItems: "center",
+                gap: "10px",
+                marginTop: "20px",
+              }}
+            >
+              <button
+                onClick={() => setPage(page - 1)}
+                disabled={page <= 1}
+                style={{ padding: "5px 10px", cursor: "pointer" }}
+              >
+                Previous
+              </button>
+              <span>
+                Page {page} of {totalPages}
+              </span>
+              <button
+                onClick={() => setPage(page + 1)}
+                disabled={page >= totalPages}
+                style={{ padding: "5px 10px", cursor: "pointer" }}
+              >
+                Next
+              </button>
+            </div>
+          )}
         </div>
 
         {adminValid && (